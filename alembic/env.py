@@ -8,6 +8,7 @@ from src.repositories.db.base import Base
 
 from src.repositories.db.models.user import User
 from src.repositories.db.models.refresh_token import RefreshToken
+from src.repositories.db.models.outbox_event import OutboxEvent
 from src.config import DatabaseConfig
 
 # this is the Alembic Config object, which provides
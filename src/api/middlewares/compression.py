@@ -0,0 +1,113 @@
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BROTLI_ENCODING = "br"
+GZIP_ENCODING = "gzip"
+
+# Already compressed or streamed formats that are not worth compressing
+_EXCLUDED_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    """Content codings of an Accept-Encoding header, without the ones refused with q=0."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        name, _, value = params.partition("=")
+        try:
+            if name.strip() == "q" and float(value) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip())
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Compresses complete response bodies of at least minimum_size bytes with brotli
+    (when installed and accepted by the client) or gzip.
+
+    Only responses sent in a single body message are compressed; streamed
+    responses such as Server-Sent Events pass through untouched, so they are
+    never buffered.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            minimum_size: int = 1024,
+            gzip_level: int = 5,
+            brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self._minimum_size = minimum_size
+        self._gzip_level = gzip_level
+        self._brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Held back until the first body message shows whether the response is compressed
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                    message.get("more_body", False)
+                    or len(body) < self._minimum_size
+                    or "content-encoding" in headers
+                    or headers.get("content-type", "").startswith(_EXCLUDED_CONTENT_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            body = self._compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _negotiate(accept_encoding: str) -> str | None:
+        if not accept_encoding:
+            return None
+        accepted = _accepted_encodings(accept_encoding)
+        if brotli is not None and BROTLI_ENCODING in accepted:
+            return BROTLI_ENCODING
+        if GZIP_ENCODING in accepted:
+            return GZIP_ENCODING
+        return None
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == BROTLI_ENCODING:
+            return brotli.compress(body, quality=self._brotli_quality)
+        return gzip.compress(body, compresslevel=self._gzip_level, mtime=0)
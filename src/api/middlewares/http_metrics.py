@@ -0,0 +1,74 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.metrics import registry
+
+UNMATCHED_ROUTE = "unmatched"
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+_requests = registry.counter("http_requests_total", "Finished HTTP requests.", ("method", "route", "status"))
+_duration = registry.histogram(
+    "http_request_duration_seconds", "Time from receiving a request to sending the last byte.", ("method", "route")
+)
+_response_size = registry.histogram(
+    "http_response_size_bytes", "Response body size.", ("method", "route"), buckets=SIZE_BUCKETS
+)
+_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being handled.")
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    Path template of the matched route, e.g. /api/v1/test/tasks/{task_id}, so that
+    every task id does not become a label value of its own.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path_format
+    # Plain Starlette routes (the docs pages) do not set scope["route"]; without
+    # path parameters their path is the template
+    if "endpoint" in scope and not scope.get("path_params"):
+        return scope["path"]
+    return UNMATCHED_ROUTE
+
+
+class HTTPMetricsMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency, response size and
+    in-flight requests per method and route template.
+
+    Unlike BaseHTTPMiddleware it does not run the endpoint in a separate task or
+    buffer the response, it only wraps send, so it is cheap enough for every request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        body_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, body_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_size += len(message.get("body", b""))
+            await send(message)
+
+        _in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            _in_flight.dec()
+            # The router has filled in the matched route by now
+            method, route = scope["method"], _route_template(scope)
+            _requests.inc(method=method, route=route, status=str(status_code))
+            _duration.observe(duration, method=method, route=route)
+            _response_size.observe(body_size, method=method, route=route)
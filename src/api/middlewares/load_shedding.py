@@ -0,0 +1,94 @@
+import asyncio
+
+from starlette.responses import JSONResponse
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import LoadSheddingConfig
+from src.utils.loop_lag import LoopLagMonitor
+from src.utils.metrics import registry
+
+_shed = registry.counter("http_requests_shed_total", "Requests rejected with 503 by load shedding.", ("route", "reason"))
+
+
+class LoadSheddingMiddleware:
+    """
+    Rejects requests with 503 and Retry-After before they reach the endpoint when
+    the service is overloaded, so one expensive route cannot slow down all others.
+
+    - Routes with a budget in ROUTE_CONCURRENCY run at most that many requests at
+      once; a request waits up to QUEUE_TIMEOUT_MS for a free slot.
+    - When the event loop lags, routes are shed by priority: every multiple of
+      LOOP_LAG_THRESHOLD_MS of lag rejects one more priority level, lowest first.
+    """
+
+    def __init__(self, app: ASGIApp, config: LoadSheddingConfig, lag_monitor: LoopLagMonitor) -> None:
+        self.app = app
+        self._config = config
+        self._lag_monitor = lag_monitor
+        self._budgets = {
+            route: asyncio.Semaphore(limit) for route, limit in config.ROUTE_CONCURRENCY.items() if limit > 0
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._config.ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        matched = self._match_route(scope)
+        if matched is None:
+            # Unknown paths are answered by the router with 404
+            await self.app(scope, receive, send)
+            return
+
+        route = matched.path_format
+        if self._is_lagging_for(route):
+            await self._reject(scope, receive, send, matched, reason="loop_lag")
+            return
+
+        budget = self._budgets.get(route)
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        if budget.locked():
+            try:
+                await asyncio.wait_for(budget.acquire(), self._config.queue_timeout)
+            except TimeoutError:
+                await self._reject(scope, receive, send, matched, reason="concurrency")
+                return
+        else:
+            await budget.acquire()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            budget.release()
+
+    @staticmethod
+    def _match_route(scope: Scope) -> BaseRoute | None:
+        # Routing has not happened yet at this point, so match the path the way the router will
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match is Match.FULL:
+                return route
+        return None
+
+    def _is_lagging_for(self, route: str) -> bool:
+        threshold = self._config.loop_lag_threshold
+        if threshold <= 0:
+            return False
+        shed_below = int(self._lag_monitor.lag / threshold)
+        return self._config.ROUTE_PRIORITY.get(route, self._config.DEFAULT_PRIORITY) < shed_below
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, route: BaseRoute, reason: str) -> None:
+        _shed.inc(route=route.path_format, reason=reason)
+        # The router never sees this request; record the route as it would, so that
+        # HTTPMetricsMiddleware counts the 503 under the route instead of "unmatched"
+        scope["route"] = route
+        response = JSONResponse(
+            {"detail": "Service is overloaded, retry later."},
+            status_code=503,
+            headers={"Retry-After": str(self._config.RETRY_AFTER)},
+        )
+        await response(scope, receive, send)
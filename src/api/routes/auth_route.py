@@ -1,10 +1,10 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 
 from src.api.utils.dependencies import get_auth_use_case, get_current_user
 from src.usecases.auth_usecase import AuthUseCase
-from src.usecases.errors import AuthenticationError, UserAlreadyExistsError
+from src.usecases.errors import AuthenticationError, LoginRateLimitError, UserAlreadyExistsError
 from src.api.schemas.auth_schemas import TokenSchema, RefreshTokenRequest, UserRegisterRequest
 from src.usecases.schemas.auth_schemas import TokenData
 from src.usecases.schemas.user_schemas import UserSchema
@@ -43,15 +43,24 @@ async def register_user_route(
 
 @router.post("/login", response_model=TokenSchema)
 async def login_route(
+        request: Request,
         form_data: OAuth2PasswordRequestForm = Depends(),
         auth_use_case: AuthUseCase = Depends(get_auth_use_case)
 ):
     try:
         tokens = await auth_use_case.login_for_access_and_refresh_token(
             username=form_data.username,
-            password=form_data.password
+            password=form_data.password,
+            # Behind a proxy this is the forwarded client address, see SERVER_FORWARDED_ALLOW_IPS
+            client_ip=request.client.host if request.client else None,
         )
         return tokens
+    except LoginRateLimitError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except AuthenticationError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -60,6 +69,14 @@ async def login_route(
         )
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_route(
+        auth_use_case: AuthUseCase = Depends(get_auth_use_case),
+        current_user: TokenData = Depends(get_current_user)
+):
+    await auth_use_case.logout(current_user)
+
+
 @router.post("/refresh", response_model=TokenSchema)
 async def refresh_token_route(
         request: RefreshTokenRequest,
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+
+from src.utils.metrics import CONTENT_TYPE, registry
+
+router = APIRouter(tags=["Monitoring"])
+
+
+@router.get(
+    "/metrics",
+    include_in_schema=False,
+    summary="Метрики процесса в формате Prometheus"
+)
+async def get_metrics():
+    # Every uvicorn worker process has its own registry, so a scrape sees the process it lands on
+    return Response(registry.render(), media_type=CONTENT_TYPE)
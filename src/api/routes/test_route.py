@@ -1,23 +1,338 @@
-from fastapi import APIRouter, Depends, status
+import logging
+from collections.abc import AsyncIterator
+
+import pydantic_core
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
 
 from src.api.utils.dependencies import get_current_user, get_producer_use_case
-from src.api.schemas.test_schemas import TestMessage
+from src.api.utils.responses import FastJSONResponse
+from src.api.schemas.test_schemas import (
+    BatchItemResult,
+    BatchPushResponse,
+    PushTaskResponse,
+    RPCCallResponse,
+    TestMessage,
+)
+from src.config import IngestConfig, ResponseConfig
+from src.usecases.errors import BrokerBackpressureError, RPCError, RPCTimeoutError, TaskNotFoundError, UnknownLaneError
 from src.usecases.producer_usecase import ProducerUseCase
 from src.usecases.schemas.auth_schemas import TokenData
+from src.usecases.schemas.task_schemas import TaskStatusSchema
+
+_log = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/test", tags=["Test"])
 
+response_config = ResponseConfig()
+ingest_config = IngestConfig()
+
+# Built once: creating an adapter compiles the validator, which is too slow to do per item
+_test_message_adapter = TypeAdapter(TestMessage)
+
+
+def _validation_error_text(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'body'}: {e['msg']}" for e in error.errors())
+
+
+async def _read_body(request: Request, limit: int) -> bytes:
+    """Read the request body, giving up with 413 as soon as it exceeds limit bytes."""
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Request body exceeds {limit} bytes"
+            )
+    return bytes(body)
+
+
+async def _iter_ndjson(request: Request) -> AsyncIterator[bytes | None]:
+    """
+    Yield the non-empty lines of an NDJSON body as they arrive, holding at most one line in memory.
+
+    A line longer than MAX_LINE_BYTES is skipped and yielded as None.
+    """
+    limit = ingest_config.MAX_LINE_BYTES
+    buffer = b""
+    skipping = False
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if skipping:
+                # The end of a line already reported as too long
+                skipping = False
+            elif len(line) > limit:
+                yield None
+            elif line.strip():
+                yield line
+        if len(buffer) > limit:
+            if not skipping:
+                yield None
+                skipping = True
+            buffer = b""
+    if buffer.strip() and not skipping:
+        yield buffer
+
+
+async def _push_in_batches(
+        items: AsyncIterator[dict | str],
+        producer_usecase: ProducerUseCase,
+        lane: str | None,
+) -> FastJSONResponse:
+    """
+    Publish the valid items PIPELINE_SIZE at a time while the rest are still being read.
+
+    items yields a message or the reason it was rejected. Only the results are kept,
+    so memory does not grow with the payloads, just with the item count. Items of a
+    batch that could not be pushed at all are reported as rejected rather than failing
+    the request, since earlier batches are already published by then.
+    """
+    results: list[BatchItemResult] = []
+    pending: list[tuple[int, dict]] = []
+
+    async def flush() -> None:
+        try:
+            outcomes = await producer_usecase.push_test_messages([data for _, data in pending], lane=lane)
+        except UnknownLaneError:
+            raise
+        except Exception as e:
+            _log.warning("Failed to push a batch of %s tasks: %s", len(pending), e)
+            outcomes = [e] * len(pending)
+        for (index, _), outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                results.append(BatchItemResult(index=index, error=str(outcome) or type(outcome).__name__))
+            else:
+                results.append(BatchItemResult(index=index, task_id=outcome))
+        pending.clear()
+
+    try:
+        index = 0
+        async for item in items:
+            if isinstance(item, str):
+                results.append(BatchItemResult(index=index, error=item))
+            else:
+                pending.append((index, item))
+                if len(pending) >= ingest_config.PIPELINE_SIZE:
+                    await flush()
+            index += 1
+        if pending:
+            await flush()
+    except UnknownLaneError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+    # Rejected items were recorded as they came, published ones a batch later
+    results.sort(key=lambda result: result.index)
+    accepted = sum(result.task_id is not None for result in results)
+    return FastJSONResponse(
+        BatchPushResponse(accepted=accepted, rejected=len(results) - accepted, results=results),
+        status_code=status.HTTP_202_ACCEPTED,
+        exclude_none=True,
+    )
+
 
 @router.post(
     "/push_task",
     status_code=status.HTTP_202_ACCEPTED,
+    response_model=PushTaskResponse,
     summary="Отправка тестового сообщения в RabbitMQ"
 )
 async def push_test_task(
         data: TestMessage,
+        lane: str | None = Query(None, description="Приоритетная полоса, например interactive или bulk."),
         producer_usecase: ProducerUseCase = Depends(get_producer_use_case),
         current_user: TokenData = Depends(get_current_user)
 ):
     message_data = data.model_dump()
-    result = await producer_usecase.push_test_message(message_data)
-    return result
\ No newline at end of file
+    try:
+        result = await producer_usecase.push_test_message(message_data, lane=lane)
+        if not response_config.ECHO_TASK_PAYLOAD:
+            # The caller has the payload already; echoing it only costs serialization and bandwidth
+            del result["data"]
+        return FastJSONResponse(
+            PushTaskResponse.model_validate(result), status_code=status.HTTP_202_ACCEPTED, exclude_none=True
+        )
+    except UnknownLaneError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except BrokerBackpressureError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+@router.post(
+    "/push_tasks",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=BatchPushResponse,
+    summary="Пакетная отправка тестовых сообщений (JSON-массив)",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": {"type": "array", "items": TestMessage.model_json_schema()}}},
+        },
+    },
+)
+async def push_test_tasks(
+        request: Request,
+        lane: str | None = Query(None, description="Приоритетная полоса, например interactive или bulk."),
+        producer_usecase: ProducerUseCase = Depends(get_producer_use_case),
+        current_user: TokenData = Depends(get_current_user)
+):
+    body = await _read_body(request, ingest_config.MAX_BATCH_BYTES)
+    try:
+        raw_items = pydantic_core.from_json(body)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid JSON: {e}"
+        )
+    del body
+    if not isinstance(raw_items, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Request body must be a JSON array"
+        )
+    if len(raw_items) > ingest_config.MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {ingest_config.MAX_BATCH_ITEMS} items, use /test/push_tasks/stream"
+        )
+
+    async def validated() -> AsyncIterator[dict | str]:
+        for raw_item in raw_items:
+            try:
+                yield _test_message_adapter.validate_python(raw_item).model_dump()
+            except ValidationError as e:
+                yield _validation_error_text(e)
+
+    return await _push_in_batches(validated(), producer_usecase, lane)
+
+
+@router.post(
+    "/push_tasks/stream",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=BatchPushResponse,
+    summary="Потоковая отправка тестовых сообщений (NDJSON)",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string"}}},
+        },
+    },
+)
+async def push_test_tasks_stream(
+        request: Request,
+        lane: str | None = Query(None, description="Приоритетная полоса, например interactive или bulk."),
+        producer_usecase: ProducerUseCase = Depends(get_producer_use_case),
+        current_user: TokenData = Depends(get_current_user)
+):
+    async def validated() -> AsyncIterator[dict | str]:
+        count = 0
+        async for line in _iter_ndjson(request):
+            count += 1
+            if count > ingest_config.MAX_STREAM_ITEMS:
+                # Stop reading, but still answer with the results of what was already published
+                yield f"Stream exceeds {ingest_config.MAX_STREAM_ITEMS} items, this and later lines were not read"
+                return
+            if line is None:
+                yield f"Line exceeds {ingest_config.MAX_LINE_BYTES} bytes"
+                continue
+            try:
+                yield _test_message_adapter.validate_json(line).model_dump()
+            except ValidationError as e:
+                yield _validation_error_text(e)
+
+    return await _push_in_batches(validated(), producer_usecase, lane)
+
+
+@router.post(
+    "/rpc",
+    response_model=RPCCallResponse,
+    summary="Синхронный вызов воркера через RabbitMQ RPC"
+)
+async def call_test_rpc(
+        data: TestMessage,
+        producer_usecase: ProducerUseCase = Depends(get_producer_use_case),
+        current_user: TokenData = Depends(get_current_user)
+):
+    try:
+        result = await producer_usecase.call_test_rpc(data.model_dump())
+        return FastJSONResponse(RPCCallResponse.model_validate(result))
+    except RPCTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
+    except RPCError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=str(e)
+        )
+
+
+@router.get(
+    "/tasks/{task_id}",
+    response_model=TaskStatusSchema,
+    summary="Статус отправленной задачи"
+)
+async def get_task_status(
+        task_id: str,
+        wait: float = Query(0, ge=0, le=30, description="Сколько секунд ждать завершения задачи."),
+        producer_usecase: ProducerUseCase = Depends(get_producer_use_case),
+        current_user: TokenData = Depends(get_current_user)
+):
+    try:
+        return FastJSONResponse(await producer_usecase.get_task_status(task_id, wait=wait))
+    except TaskNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+
+@router.get(
+    "/tasks/{task_id}/events",
+    summary="Поток изменений статуса задачи (Server-Sent Events)"
+)
+async def stream_task_status(
+        task_id: str,
+        producer_usecase: ProducerUseCase = Depends(get_producer_use_case),
+        current_user: TokenData = Depends(get_current_user)
+):
+    try:
+        await producer_usecase.get_task_status(task_id)
+    except TaskNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    async def event_stream():
+        updates = producer_usecase.stream_task_status(
+            task_id,
+            max_wait=response_config.TASK_EVENTS_MAX_SECONDS,
+            heartbeat=response_config.TASK_EVENTS_HEARTBEAT_SECONDS,
+        )
+        async for task_status in updates:
+            if task_status is None:
+                # An SSE comment: keeps proxies from closing an idle connection and reveals a gone client
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: status\ndata: {task_status.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,3 +1,5 @@
+from typing import Any
+
 from pydantic import BaseModel, Field
 
 class TestMessage(BaseModel):
@@ -10,4 +12,23 @@ class TestMessage(BaseModel):
         "Template API",
         example="Auth Service",
         description="Идентификатор отправителя сообщения."
-    )
\ No newline at end of file
+    )
+
+class PushTaskResponse(BaseModel):
+    status: str
+    task_id: str
+    data: dict[str, Any] | None = None
+
+class RPCCallResponse(BaseModel):
+    status: str
+    result: Any = None
+
+class BatchItemResult(BaseModel):
+    index: int
+    task_id: str | None = None
+    error: str | None = None
+
+class BatchPushResponse(BaseModel):
+    accepted: int
+    rejected: int
+    results: list[BatchItemResult]
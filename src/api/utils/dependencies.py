@@ -5,7 +5,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from src.container import container
 from src.usecases.auth_usecase import AuthUseCase
 from src.utils.security import verify_token_and_get_data
-from src.usecases.errors import AuthenticationError
+from src.usecases.errors import AuthenticationError, RevocationCheckUnavailableError
 from src.usecases.schemas.auth_schemas import TokenData
 from src.usecases.producer_usecase import ProducerUseCase
 
@@ -14,21 +14,32 @@ _log = logging.getLogger(__name__)
 bearer_scheme = HTTPBearer()
 
 
-def get_current_user(token: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> TokenData:
+# Async, so FastAPI does not hand these to the thread pool; both return container singletons
+async def get_auth_use_case() -> AuthUseCase:
+    return container.resolve(AuthUseCase)
+
+async def get_producer_use_case() -> ProducerUseCase:
+    return container.resolve(ProducerUseCase)
+
+
+async def get_current_user(
+        token: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+        auth_use_case: AuthUseCase = Depends(get_auth_use_case),
+) -> TokenData:
     try:
         token_data = verify_token_and_get_data(token.credentials)
+        await auth_use_case.ensure_not_revoked(token_data)
         return token_data
     except AuthenticationError as e:
-        _log.error(f"Authentication failed: {e}")
+        _log.error("Authentication failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-
-
-def get_auth_use_case() -> AuthUseCase:
-    return container.resolve(AuthUseCase)
-
-def get_producer_use_case() -> ProducerUseCase:
-    return container.resolve(ProducerUseCase)
\ No newline at end of file
+    except RevocationCheckUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
@@ -0,0 +1,47 @@
+import json
+from collections.abc import Mapping
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class of the app.
+
+    Models are dumped straight to JSON bytes by pydantic-core. FastAPI hands a
+    response class only the output it has already serialized from a response_model,
+    so a route gets that path by returning FastJSONResponse(model) itself; FastAPI
+    then skips its own validation and serialization. Everything else is dumped by
+    orjson when it is installed (the 'codecs' extra) and by the standard library
+    otherwise.
+    """
+
+    # The parameters are spelled out because FastAPI reads the default status code from this signature
+    def __init__(
+            self,
+            content: Any,
+            status_code: int = 200,
+            headers: Mapping[str, str] | None = None,
+            media_type: str | None = None,
+            background: BackgroundTask | None = None,
+            exclude_none: bool = False,
+    ) -> None:
+        # Set before JSONResponse.__init__, which renders the body
+        self._exclude_none = exclude_none
+        super().__init__(content, status_code, headers, media_type, background)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return pydantic_core.to_json(content, exclude_none=self._exclude_none)
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
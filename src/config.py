@@ -1,3 +1,4 @@
+import os
 from datetime import datetime, timezone, timedelta
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,6 +13,27 @@ class RabbitMQConfig(BaseSettings):
     OUT_TASK_EXCHANGE: str
     CONNECTION_TIMEOUT: int
     RETRY_INTERVAL: int
+    RETRY_BASE_DELAY_MS: int = 1000
+    RETRY_BACKOFF_FACTOR: int = 5
+    RETRY_TIERS: int = 4
+    RETRY_MAX_ATTEMPTS: int = 5
+    MESSAGE_CONTENT_TYPE: str = "application/json"
+    MESSAGE_COMPRESSION: str | None = None
+    MESSAGE_COMPRESSION_THRESHOLD: int = 4096
+    PUBLISH_TIMEOUT: float = 5.0
+    SPOOL_DIR: str = "/tmp/rabbitmq_spool"
+    SPOOL_MEMORY_MESSAGES: int = 1000
+    SPOOL_MAX_BYTES: int = 64 * 1024 * 1024
+    SPOOL_RETRY_AFTER: int = 5
+    SPOOL_FLUSH_TIMEOUT: float = 5.0
+    RPC_QUEUE: str = "rpc_tasks"
+    RPC_EXCHANGE: str = "rpc_tasks"
+    RPC_TIMEOUT: float = 10.0
+    RPC_PREFETCH_COUNT: int = 32
+    LANE_WEIGHTS: dict[str, int] = {"interactive": 8, "default": 4, "bulk": 1}
+    DEFAULT_LANE: str = "default"
+    SHARD_COUNT: int = 8
+    SHARD_PREFETCH_COUNT: int = 16
 
     model_config = SettingsConfigDict(
         env_prefix="RABBITMQ_",
@@ -22,6 +44,14 @@ class RabbitMQConfig(BaseSettings):
     def URL(self) -> str:
         return f"amqp://{self.USER}:{self.PASSWORD}@{self.HOST}:{self.PORT}/"
 
+    @property
+    def retry_delays(self) -> list[int]:
+        return [self.RETRY_BASE_DELAY_MS * self.RETRY_BACKOFF_FACTOR ** tier for tier in range(self.RETRY_TIERS)]
+
+    @property
+    def lane_weights(self) -> dict[str, int]:
+        return {self.DEFAULT_LANE: 1} | self.LANE_WEIGHTS
+
 class DatabaseConfig(BaseSettings):
     PORT: str
     HOST: str
@@ -46,6 +76,17 @@ class SecurityConfig(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Login attempts are limited by token buckets per username and per client IP,
+    # checked before the password hash is verified
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_USERNAME_BURST: int = 5
+    LOGIN_USERNAME_PER_MINUTE: float = 5
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 60
+    # Revoked access tokens are mirrored in a per-process Bloom filter resynced at this interval
+    REVOCATION_SYNC_INTERVAL_MS: int = 1000
+    REVOCATION_FILTER_CAPACITY: int = 100_000
+    REVOCATION_FILTER_ERROR_RATE: float = 0.001
 
     model_config = SettingsConfigDict(
         env_prefix="SECURITY_",
@@ -61,6 +102,10 @@ class SecurityConfig(BaseSettings):
     def refresh_token_expires(self) -> timedelta:
         return timedelta(days=self.REFRESH_TOKEN_EXPIRE_DAYS)
 
+    @property
+    def revocation_sync_interval(self) -> float:
+        return self.REVOCATION_SYNC_INTERVAL_MS / 1000
+
 class RedisConfig(BaseSettings):
     HOST: str = "redis"
     PORT: int = 6379
@@ -68,6 +113,7 @@ class RedisConfig(BaseSettings):
     USER: str = "default"
     PASSWORD: str = ""
     PREFIX: str = "local"
+    TASK_STATUS_TTL: int = 60 * 60 * 24
 
     model_config = SettingsConfigDict(
         env_prefix="REDIS_",
@@ -75,8 +121,134 @@ class RedisConfig(BaseSettings):
         env_file=".env"
     )
 
+class ServerConfig(BaseSettings):
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    # 0 starts one worker process per available CPU core
+    WORKERS: int = 0
+    LOOP: str = "uvloop"
+    HTTP: str = "httptools"
+    BACKLOG: int = 2048
+    KEEP_ALIVE_TIMEOUT: int = 5
+    LIMIT_CONCURRENCY: int | None = None
+    MAX_REQUESTS: int | None = None
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = 10
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    ACCESS_LOG: bool = True
+
+    model_config = SettingsConfigDict(env_prefix="SERVER_", extra="ignore", env_file=".env")
+
+    @property
+    def worker_count(self) -> int:
+        if self.WORKERS > 0:
+            return self.WORKERS
+        # Respects CPU affinity and container cpusets, unlike os.cpu_count()
+        return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+class ResponseConfig(BaseSettings):
+    # Complete response bodies of at least COMPRESSION_MIN_SIZE bytes are compressed with brotli or gzip
+    COMPRESSION: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 5
+    BROTLI_QUALITY: int = 4
+    # Whether /test/push_task sends the pushed payload back to the caller
+    ECHO_TASK_PAYLOAD: bool = True
+    # /test/tasks/{id}/events ends after this long even if the task is not finished,
+    # and sends a keep-alive comment after this many idle seconds
+    TASK_EVENTS_MAX_SECONDS: int = 300
+    TASK_EVENTS_HEARTBEAT_SECONDS: int = 15
+
+    model_config = SettingsConfigDict(env_prefix="RESPONSE_", extra="ignore", env_file=".env")
+
+class IngestConfig(BaseSettings):
+    # Publishes of the batch endpoints in flight at once
+    PIPELINE_SIZE: int = 100
+    # Limits of /test/push_tasks, whose JSON array is read whole
+    MAX_BATCH_ITEMS: int = 1000
+    MAX_BATCH_BYTES: int = 8 * 1024 * 1024
+    # Limits of /test/push_tasks/stream, whose NDJSON body is read line by line
+    MAX_STREAM_ITEMS: int = 100_000
+    MAX_LINE_BYTES: int = 1024 * 1024
+
+    model_config = SettingsConfigDict(env_prefix="INGEST_", extra="ignore", env_file=".env")
+
+class LoadSheddingConfig(BaseSettings):
+    ENABLED: bool = True
+    # In-flight requests allowed per route template; routes not listed are not limited
+    ROUTE_CONCURRENCY: dict[str, int] = {
+        "/api/v1/auth/login": 8,
+        "/api/v1/auth/register": 8,
+        "/api/v1/auth/refresh": 64,
+        "/api/v1/test/push_task": 256,
+    }
+    # How long a request may wait for a free slot of its route before it gets 503
+    QUEUE_TIMEOUT_MS: int = 100
+    # Routes with a lower priority are shed first when the event loop lags
+    ROUTE_PRIORITY: dict[str, int] = {"/api/v1/auth/login": 0, "/api/v1/auth/register": 0, "/metrics": 9}
+    DEFAULT_PRIORITY: int = 1
+    # Every multiple of this lag sheds one more priority level: priority 0 above 1x, priority 1 above 2x and so on
+    LOOP_LAG_THRESHOLD_MS: int = 100
+    LOOP_LAG_INTERVAL_MS: int = 50
+    RETRY_AFTER: int = 1
+
+    model_config = SettingsConfigDict(env_prefix="LOAD_SHEDDING_", extra="ignore", env_file=".env")
+
+    @property
+    def queue_timeout(self) -> float:
+        return self.QUEUE_TIMEOUT_MS / 1000
+
+    @property
+    def loop_lag_threshold(self) -> float:
+        return self.LOOP_LAG_THRESHOLD_MS / 1000
+
+    @property
+    def loop_lag_interval(self) -> float:
+        return self.LOOP_LAG_INTERVAL_MS / 1000
+
 class LoggingConfig(BaseSettings):
     LOG_LEVEL: str = "INFO"
+    # One JSON object per line; false gives the plain text format for local runs
+    JSON: bool = True
+    # Records below ERROR a single logger may emit per window, the rest are counted and dropped
+    RATE_LIMIT: int = 100
+    RATE_LIMIT_WINDOW_SECONDS: float = 1.0
 
     model_config = SettingsConfigDict(env_prefix="LOGGING_", extra="ignore", env_file=".env")
 
+class WorkerConfig(BaseSettings):
+    INDEX: int = 0
+    COUNT: int = 1
+    CONCURRENCY: int = 32
+    ADAPTIVE_CONCURRENCY: bool = True
+    CONCURRENCY_FLOOR: int = 4
+    CONCURRENCY_CEILING: int = 128
+    CONCURRENCY_LATENCY_TOLERANCE: float = 2.0
+    CONCURRENCY_BACKOFF: float = 0.7
+    HANDLER_CONCURRENCY: dict[str, int] = {}
+    METRICS_PORT: int = 9100
+    QUEUE_DEPTH_INTERVAL_MS: int = 15000
+    SHUTDOWN_TIMEOUT_SECONDS: float = 25.0
+    BATCH_SIZE: int = 1
+    BATCH_TIMEOUT_MS: int = 500
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_MS: int = 1000
+    DEDUP_WINDOW_SECONDS: int = 60 * 60 * 24
+    DEDUP_LEASE_SECONDS: int = 300
+    DEDUP_LOCAL_CACHE_SIZE: int = 10000
+
+    model_config = SettingsConfigDict(env_prefix="WORKER_", extra="ignore", env_file=".env")
+
+    def claimed_shards(self, shard_count: int) -> list[int]:
+        return [shard for shard in range(shard_count) if shard % self.COUNT == self.INDEX]
+
+    @property
+    def batch_timeout(self) -> float:
+        return self.BATCH_TIMEOUT_MS / 1000
+
+    @property
+    def outbox_poll_interval(self) -> float:
+        return self.OUTBOX_POLL_INTERVAL_MS / 1000
+
+    @property
+    def queue_depth_interval(self) -> float:
+        return self.QUEUE_DEPTH_INTERVAL_MS / 1000
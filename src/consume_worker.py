@@ -1,42 +1,189 @@
 import asyncio
 import logging
-import sys
+import signal
+import time
+from functools import partial
+
+from redis.asyncio import Redis
 
 from src.container import container
 
-from src.config import LoggingConfig
+from src.config import RabbitMQConfig, WorkerConfig
+from src.repositories.db.base import dispose_engine
 from src.usecases.consumer_usecase import ConsumerUseCase
+from src.usecases.outbox_relay_usecase import OutboxRelayUseCase
+from src.usecases.schemas.message_schemas import InboundMessage
 from src.usecases.interfaces.rabbit_interfaces.rabbit_out_in_interface import OutInRabbitMQRepositoryInterface
+from src.usecases.interfaces.rabbit_interfaces.rabbit_rpc_interface import RPCRabbitMQRepositoryInterface
+from src.usecases.interfaces.task_status_interface import TaskStatusInterface
+from src.utils.concurrency_limiter import AdaptiveConcurrencyLimiter
+from src.utils.log_setup import setup_logging
+from src.utils.metrics import registry, start_metrics_server
+from src.utils.startup import run_startup_phases
 
 _log = logging.getLogger(__name__)
 
-logging.basicConfig(
-    level=LoggingConfig().LOG_LEVEL,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
+setup_logging()
+
+_handler_duration = registry.histogram(
+    "worker_handler_duration_seconds", "Time spent handling a message, by type and outcome.", ("type", "outcome")
+)
+_end_to_end_latency = registry.histogram(
+    "worker_message_end_to_end_seconds", "Time from publishing a message to finishing its handling.", ("type",)
 )
+_handled = registry.counter("worker_messages_handled_total", "Handled messages, by type and outcome.", ("type", "outcome"))
 
-async def message_handler(message_data: dict):
+
+def _observe(message: InboundMessage, started: float, outcome: str) -> None:
+    finished = time.time()
+    message_type = message.message_type or ""
+    _handled.inc(type=message_type, outcome=outcome)
+    _handler_duration.observe(finished - started, type=message_type, outcome=outcome)
+    if message.published_at is not None:
+        _end_to_end_latency.observe(max(0.0, finished - message.published_at), type=message_type)
+
+async def message_handler(consumer_usecase: ConsumerUseCase, message: InboundMessage):
+    started = time.time()
     try:
-        consumer_usecase: ConsumerUseCase = container.resolve(ConsumerUseCase)
-        _log.info(f"Worker task received. Starting processing.")
-        await consumer_usecase.process_inbound_message(message_data)
+        _log.info("Worker task %s received (attempt %s). Starting processing.", message.message_id, message.attempt)
+        await consumer_usecase.process_inbound_message(message)
         _log.info("Worker task processing completed successfully.")
+        _observe(message, started, "success")
 
     except Exception as e:
-        _log.error(f"Error processing worker task: {e}")
+        _log.error("Error processing worker task: %s", e)
+        _observe(message, started, "error")
+        # Propagate so the message is routed to a retry tier instead of being acked
+        raise
+
+async def batch_message_handler(consumer_usecase: ConsumerUseCase, batch: list[InboundMessage]) -> dict[int, Exception]:
+    started = time.time()
+    try:
+        _log.info("Worker batch of %s tasks received. Starting processing.", len(batch))
+        failures = await consumer_usecase.process_inbound_batch(batch)
+        _log.info("Worker batch processing completed, %s message(s) failed.", len(failures))
+        for position, message in enumerate(batch):
+            _observe(message, started, "error" if position in failures else "success")
+        # Only the failed messages are routed to the retry tiers
+        return failures
+
+    except Exception as e:
+        _log.error("Error processing worker batch: %s", e)
+        for message in batch:
+            _observe(message, started, "error")
+        raise
+
+async def shutdown(
+        rabbit_repo: OutInRabbitMQRepositoryInterface,
+        rpc_repo: RPCRabbitMQRepositoryInterface,
+        background_tasks: list[asyncio.Task],
+        timeout: float,
+) -> None:
+    """
+    Stop consuming, let in-flight messages finish within timeout seconds so they
+    are acked rather than redelivered, then flush pending publishes and close
+    every connection.
+    """
+    _log.info("Draining the worker (timeout %ss)...", timeout)
+    await rabbit_repo.drain(timeout)
+
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+    for close in (
+            rpc_repo.close,
+            rabbit_repo.close,
+            container.resolve(TaskStatusInterface).close,
+            container.resolve(Redis).aclose,
+            dispose_engine,
+    ):
+        try:
+            await close()
+        except Exception as e:
+            _log.warning("Error during shutdown: %s", e)
+    _log.info("Worker stopped.")
 
 async def main():
     _log.info("Starting RabbitMQ Worker...")
+    stop = asyncio.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+
+    worker_config = WorkerConfig()
+    rabbit_repo: OutInRabbitMQRepositoryInterface = container.resolve(OutInRabbitMQRepositoryInterface)
+    rpc_repo: RPCRabbitMQRepositoryInterface = container.resolve(RPCRabbitMQRepositoryInterface)
+    background_tasks: list[asyncio.Task] = []
     try:
-        rabbit_repo: OutInRabbitMQRepositoryInterface = container.resolve(OutInRabbitMQRepositoryInterface)
+        await run_startup_phases({
+            "rabbitmq": rabbit_repo.connect_and_declare(),
+            "rabbitmq_rpc": rpc_repo.connect_and_declare(),
+        })
 
-        await rabbit_repo.connect_and_declare()
-        _log.info("Worker connected. Starting to listen to the queue...")
-        await rabbit_repo.consume_tasks(on_message_callback=message_handler)
+        if worker_config.METRICS_PORT:
+            await start_metrics_server(worker_config.METRICS_PORT)
+            # Queue depths are only worth polling when someone can scrape them
+            background_tasks.append(asyncio.create_task(
+                rabbit_repo.monitor_queues(interval=worker_config.queue_depth_interval)
+            ))
+
+        # Drain domain events written by the API into the transactional outbox
+        outbox_relay: OutboxRelayUseCase = container.resolve(OutboxRelayUseCase)
+        background_tasks.append(asyncio.create_task(
+            outbox_relay.run(
+                batch_size=worker_config.OUTBOX_BATCH_SIZE,
+                poll_interval=worker_config.outbox_poll_interval,
+            )
+        ))
+
+        # Resolved once: every message is dispatched through the same handler registry
+        consumer_usecase: ConsumerUseCase = container.resolve(ConsumerUseCase)
+
+        # Answer request/reply calls alongside the task queue
+        background_tasks.append(asyncio.create_task(rpc_repo.serve(consumer_usecase.handle_rpc_call)))
+
+        # Key-partitioned messages (per-user events) are consumed in order from the shards this worker claims
+        shards = worker_config.claimed_shards(RabbitMQConfig().SHARD_COUNT)
+        background_tasks.append(asyncio.create_task(
+            rabbit_repo.consume_partitions(
+                on_message_callback=partial(message_handler, consumer_usecase),
+                shards=shards,
+            )
+        ))
+
+        _log.info("Worker %s/%s connected, claimed shards %s. Starting to listen to the queue...", worker_config.INDEX, worker_config.COUNT, shards)
+        if worker_config.BATCH_SIZE > 1:
+            consume = rabbit_repo.consume_batches(
+                on_batch_callback=partial(batch_message_handler, consumer_usecase),
+                batch_size=worker_config.BATCH_SIZE,
+                batch_timeout=worker_config.batch_timeout,
+            )
+        else:
+            limiter = None
+            if worker_config.ADAPTIVE_CONCURRENCY:
+                # Starts at CONCURRENCY and adapts to handler latency and errors within the floor and ceiling
+                limiter = AdaptiveConcurrencyLimiter(
+                    initial=worker_config.CONCURRENCY,
+                    floor=worker_config.CONCURRENCY_FLOOR,
+                    ceiling=worker_config.CONCURRENCY_CEILING,
+                    latency_tolerance=worker_config.CONCURRENCY_LATENCY_TOLERANCE,
+                    backoff=worker_config.CONCURRENCY_BACKOFF,
+                )
+            consume = rabbit_repo.consume_tasks(
+                on_message_callback=partial(message_handler, consumer_usecase),
+                concurrency=worker_config.CONCURRENCY,
+                limiter=limiter,
+            )
+        background_tasks.append(asyncio.create_task(consume))
+
+        await stop.wait()
+        _log.info("Shutdown signal received.")
 
     except Exception as e:
-        _log.critical(f"A critical error occurred while starting the worker: {e}")
+        _log.critical("A critical error occurred while starting the worker: %s", e)
+
+    finally:
+        await shutdown(rabbit_repo, rpc_repo, background_tasks, worker_config.SHUTDOWN_TIMEOUT_SECONDS)
 
 if __name__ == "__main__":
     try:
@@ -1,51 +1,130 @@
-from punq import Container
+from punq import Container, Scope
+from redis.asyncio import Redis
 
-from src.repositories.redis_repository import RedisCacheRepository
+from src.repositories.redis_repository import RedisCacheRepository, register_pool_metrics
+from src.repositories.redis_idempotency_repository import RedisIdempotencyRepository
+from src.repositories.redis_rate_limit_repository import RedisRateLimitRepository
+from src.repositories.redis_task_status_repository import RedisTaskStatusRepository
+from src.repositories.redis_token_revocation_repository import RedisTokenRevocationRepository
 from src.repositories.rabbit_repositories.rabbit_out_in_repository import OutInRabbitMQRepository
-from src.config import RabbitMQConfig, DatabaseConfig, RedisConfig
+from src.repositories.rabbit_repositories.rabbit_rpc_repository import RPCRabbitMQRepository
+from src.config import RabbitMQConfig, DatabaseConfig, RedisConfig, SecurityConfig, WorkerConfig
 from src.repositories.db.base import session_factory
+from src.repositories.db_repositories.db_outbox_repository import DBOutboxRepository
 from src.repositories.db_repositories.db_refresh_token_repository import DBRefreshTokenRepository
 from src.repositories.db_repositories.db_user_repository import DBUserRepository
 from src.usecases.auth_usecase import AuthUseCase
 from src.usecases.interfaces.db_interfaces.db_user_interface import DBUserInterface
 from src.usecases.consumer_usecase import ConsumerUseCase
 from src.usecases.interfaces.db_interfaces.db_refresh_token_interface import DBRefreshTokenInterface
+from src.usecases.interfaces.db_interfaces.db_outbox_interface import DBOutboxInterface
 from src.usecases.interfaces.rabbit_interfaces.rabbit_out_in_interface import OutInRabbitMQRepositoryInterface
+from src.usecases.interfaces.rabbit_interfaces.rabbit_rpc_interface import RPCRabbitMQRepositoryInterface
 from src.usecases.producer_usecase import ProducerUseCase
+from src.usecases.outbox_relay_usecase import OutboxRelayUseCase
 from src.usecases.interfaces.cache_interface import Cache
+from src.usecases.interfaces.task_status_interface import TaskStatusInterface
+from src.usecases.interfaces.idempotency_interface import IdempotencyInterface
+from src.usecases.interfaces.rate_limit_interface import RateLimitInterface
+from src.usecases.interfaces.token_revocation_interface import TokenRevocationInterface
 
 container = Container()
 
-container.register(RabbitMQConfig, instance=RabbitMQConfig())
-container.register(DatabaseConfig, instance=DatabaseConfig())
-container.register(RedisConfig, instance=RedisConfig())
+rabbitmq_config = RabbitMQConfig()
+database_config = DatabaseConfig()
+redis_config = RedisConfig()
+worker_config = WorkerConfig()
+security_config = SecurityConfig()
 
+container.register(RabbitMQConfig, instance=rabbitmq_config)
+container.register(DatabaseConfig, instance=database_config)
+container.register(RedisConfig, instance=redis_config)
+container.register(WorkerConfig, instance=worker_config)
+container.register(SecurityConfig, instance=security_config)
+
+# One connection pool per process, shared by every Redis-backed repository.
+# Building the client does not connect; connections are opened on first use.
 container.register(
-    Cache,
-    factory=lambda: RedisCacheRepository(
-        prefix=RedisConfig().PREFIX,
-        host=RedisConfig().HOST,
-        port=RedisConfig().PORT,
-        db=RedisConfig().DB,
-        password=RedisConfig().PASSWORD,
+    Redis,
+    instance=Redis(
+        host=redis_config.HOST,
+        port=redis_config.PORT,
+        db=redis_config.DB,
+        password=redis_config.PASSWORD,
+        decode_responses=True,
+    ),
+)
+register_pool_metrics(container.resolve(Redis))
+
+container.register(Cache, instance=RedisCacheRepository(prefix=redis_config.PREFIX, client=container.resolve(Redis)))
+
+# Singleton so every status waiter in the process shares one pub/sub subscription
+container.register(
+    TaskStatusInterface,
+    instance=RedisTaskStatusRepository(
+        ttl=redis_config.TASK_STATUS_TTL,
+        prefix=redis_config.PREFIX,
+        client=container.resolve(Redis),
     )
 )
 
+# Singleton so the local LRU of processed message ids and the counters live as long as the worker
 container.register(
-    DBUserInterface,
-    factory=lambda: DBUserRepository(
-        session_factory=session_factory,
-        cache=container.resolve(Cache),
-    ),
+    IdempotencyInterface,
+    instance=RedisIdempotencyRepository(
+        window=worker_config.DEDUP_WINDOW_SECONDS,
+        lease=worker_config.DEDUP_LEASE_SECONDS,
+        local_size=worker_config.DEDUP_LOCAL_CACHE_SIZE,
+        prefix=redis_config.PREFIX,
+        client=container.resolve(Redis),
+    )
+)
+
+# Singleton so the local map of blocked keys is shared by all requests of the process
+container.register(
+    RateLimitInterface,
+    instance=RedisRateLimitRepository(prefix=redis_config.PREFIX, client=container.resolve(Redis)),
 )
+
+# Singleton so the process keeps one Bloom filter of revoked tokens and one task syncing it
+container.register(
+    TokenRevocationInterface,
+    instance=RedisTokenRevocationRepository(
+        sync_interval=security_config.revocation_sync_interval,
+        capacity=security_config.REVOCATION_FILTER_CAPACITY,
+        error_rate=security_config.REVOCATION_FILTER_ERROR_RATE,
+        prefix=redis_config.PREFIX,
+        client=container.resolve(Redis),
+    )
+)
+
+# Database repositories keep their session per task (see BaseRepository), so one
+# instance of each serves every request
+container.register(DBUserInterface, DBUserRepository, scope=Scope.singleton, session_factory=session_factory)
 container.register(
     DBRefreshTokenInterface,
-    factory=DBRefreshTokenRepository,
+    DBRefreshTokenRepository,
+    scope=Scope.singleton,
     session_factory=session_factory,
 )
+container.register(DBOutboxInterface, DBOutboxRepository, scope=Scope.singleton, session_factory=session_factory)
+
+# One shared connection and outbound spool per process
+container.register(OutInRabbitMQRepositoryInterface, OutInRabbitMQRepository, scope=Scope.singleton)
+container.register(RPCRabbitMQRepositoryInterface, RPCRabbitMQRepository, scope=Scope.singleton)
+
+# Use cases hold no per-request state, so they are built once as well
+container.register(AuthUseCase, scope=Scope.singleton)
+# Built once per worker: the handler registry, its TypeAdapters and per-type limits are shared by all messages
+container.register(ConsumerUseCase, scope=Scope.singleton)
+container.register(ProducerUseCase, scope=Scope.singleton)
+container.register(OutboxRelayUseCase, scope=Scope.singleton)
 
-container.register(OutInRabbitMQRepositoryInterface, OutInRabbitMQRepository)
 
-container.register(AuthUseCase)
-container.register(ConsumerUseCase)
-container.register(ProducerUseCase)
+def build_singletons(*services: type) -> None:
+    """
+    Resolve the given services up front, e.g. in the application startup, so the
+    whole object graph is built once before the first request instead of lazily on it.
+    """
+    for service in services:
+        container.resolve(service)
@@ -1,57 +1,59 @@
 import logging
-import sys
 from contextlib import asynccontextmanager
 
-import aio_pika
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from tenacity import retry, stop_after_attempt, wait_fixed
+from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential_jitter
+from redis.asyncio import Redis
 from sqlalchemy import text
 
-from src.container import container
-from src.config import LoggingConfig, RabbitMQConfig
+from src.container import build_singletons, container
+from src.config import LoadSheddingConfig, ResponseConfig
+from src.api.middlewares.compression import CompressionMiddleware
+from src.api.middlewares.http_metrics import HTTPMetricsMiddleware
+from src.api.middlewares.load_shedding import LoadSheddingMiddleware
 from src.api.routes.auth_route import router as auth_router
+from src.api.routes.metrics_route import router as metrics_router
+from src.api.utils.responses import FastJSONResponse
 from src.api.routes.test_route import router as test_router
-from src.repositories.db.base import session_factory
+from src.repositories.db.base import dispose_engine, session_factory
+from src.usecases.auth_usecase import AuthUseCase
+from src.usecases.producer_usecase import ProducerUseCase
 from src.usecases.interfaces.rabbit_interfaces.rabbit_out_in_interface import OutInRabbitMQRepositoryInterface
+from src.usecases.interfaces.rabbit_interfaces.rabbit_rpc_interface import RPCRabbitMQRepositoryInterface
+from src.usecases.interfaces.task_status_interface import TaskStatusInterface
+from src.usecases.interfaces.token_revocation_interface import TokenRevocationInterface
+from src.utils.log_setup import setup_logging
+from src.utils.loop_lag import LoopLagMonitor
+from src.utils.startup import run_startup_phases
 
 _log = logging.getLogger(__name__)
 
-logging.basicConfig(
-    level=LoggingConfig().LOG_LEVEL,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
-)
-
+setup_logging()
 
-@retry(stop=stop_after_attempt(10), wait=wait_fixed(2))
-async def check_rabbitmq_connection():
-    """
-    Check RabbitMQ connection with retry mechanism.
-    """
-    try:
-        _log.info("Checking RabbitMQ connection availability")
-        connection = await aio_pika.connect_robust(RabbitMQConfig().URL)
-        await connection.close()
-        _log.info("RabbitMQ connection check successful")
-    except Exception as e:
-        _log.error(f"RabbitMQ connection check failed: {str(e)}")
-        raise
+load_shedding_config = LoadSheddingConfig()
+response_config = ResponseConfig()
+loop_lag_monitor = LoopLagMonitor(load_shedding_config.loop_lag_interval)
 
 
-@retry(stop=stop_after_attempt(10), wait=wait_fixed(2))
 async def check_db_connection():
     """
     Check DB connection with retry mechanism.
     """
-    try:
-        _log.info("Checking database connection availability")
-        async with session_factory() as session:
-            await session.execute(text("SELECT 1"))
-        _log.info("Database connection check successful")
-    except Exception as e:
-        _log.error(f"Database connection check failed: {str(e)}")
-        raise
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(10),
+        wait=wait_exponential_jitter(initial=0.1, max=2, jitter=0.1),
+        reraise=True,
+    ):
+        with attempt:
+            try:
+                _log.info("Checking database connection availability")
+                async with session_factory() as session:
+                    await session.execute(text("SELECT 1"))
+                _log.info("Database connection check successful")
+            except Exception as e:
+                _log.error("Database connection check failed: %s", str(e))
+                raise
 
 
 @asynccontextmanager
@@ -62,34 +64,51 @@ async def lifespan(app: FastAPI):
     _log.info("Starting Template Service initialization")
 
     try:
-        # Verify RabbitMQ and DB are available before proceeding
-        await check_rabbitmq_connection()
-        await check_db_connection()
-        _log.info("All dependencies are available.")
-
-        # Initialize RabbitMQ connection and store it in app state
-        _log.info("Initializing RabbitMQ connections")
-        out_in_rabbit_repo = container.resolve(OutInRabbitMQRepositoryInterface)
-        await out_in_rabbit_repo.connect_and_declare()
-        app.state.out_in_rabbit_repo = out_in_rabbit_repo
-
-        _log.info("All RabbitMQ connections and queues established successfully")
+        # Stored before connecting, so the shutdown below also closes a half-started connection
+        app.state.out_in_rabbit_repo = container.resolve(OutInRabbitMQRepositoryInterface)
+        app.state.rpc_rabbit_repo = container.resolve(RPCRabbitMQRepositoryInterface)
+
+        # Probe the dependencies concurrently; the RabbitMQ connections opened here are
+        # the ones the application keeps, rather than a throwaway check connection
+        await run_startup_phases({
+            "rabbitmq": app.state.out_in_rabbit_repo.connect_and_declare(),
+            "rabbitmq_rpc": app.state.rpc_rabbit_repo.connect_and_declare(),
+            "database": check_db_connection(),
+        })
+        _log.info("All RabbitMQ connections, queues and the database are available.")
+
+        # Build the request handling object graph now rather than on the first request
+        build_singletons(AuthUseCase, ProducerUseCase)
+
+        loop_lag_monitor.start()
+        # Keeps the local filter of revoked access tokens in sync with Redis
+        container.resolve(TokenRevocationInterface).start()
 
         _log.info("Template Service started successfully")
         yield
 
     except Exception as e:
-        _log.critical(f"Fatal error during application startup: {str(e)}")
+        _log.critical("Fatal error during application startup: %s", str(e))
         raise
 
     finally:
         # Cleanup procedures
         _log.info("Starting application shutdown")
+        await loop_lag_monitor.stop()
+
+        # Flush spooled publishes and close the broker connections
+        if hasattr(app.state, 'out_in_rabbit_repo'):
+            await app.state.out_in_rabbit_repo.close()
+
+        if hasattr(app.state, 'rpc_rabbit_repo'):
+            await app.state.rpc_rabbit_repo.close()
 
-        # Close RabbitMQ connection
-        if hasattr(app.state, 'rabbit_repo') and app.state.rabbit_repo.connection:
-            await app.state.rabbit_repo.connection.close()
-            _log.info("RabbitMQ connection closed")
+        # Stop the task status subscription and close the Redis and database pools
+        await container.resolve(TaskStatusInterface).close()
+        await container.resolve(TokenRevocationInterface).close()
+        await container.resolve(Redis).aclose()
+        await dispose_engine()
+        _log.info("Redis subscription and database connections closed")
 
         _log.info("Application shutdown completed")
 
@@ -99,6 +118,7 @@ app = FastAPI(
     description="Шаблон микросервиса",
     lifespan=lifespan,
     redirect_slashes=False,
+    default_response_class=FastJSONResponse,
 )
 
 # Create main API router with /api/v1 prefix
@@ -108,6 +128,19 @@ api_v1_router.include_router(test_router)
 
 # Register the main API router
 app.include_router(api_v1_router)
+# Prometheus scrape endpoint, outside the versioned API
+app.include_router(metrics_router)
+
+if response_config.COMPRESSION:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=response_config.COMPRESSION_MIN_SIZE,
+        gzip_level=response_config.GZIP_LEVEL,
+        brotli_quality=response_config.BROTLI_QUALITY,
+    )
+app.add_middleware(LoadSheddingMiddleware, config=load_shedding_config, lag_monitor=loop_lag_monitor)
+# Added last, so it is the outer one and also counts the requests shed with 503
+app.add_middleware(HTTPMetricsMiddleware)
 
 if __name__ == "__main__":
     import uvicorn
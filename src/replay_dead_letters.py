@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+import logging
+
+from src.container import container
+
+from src.usecases.interfaces.rabbit_interfaces.rabbit_out_in_interface import OutInRabbitMQRepositoryInterface
+from src.utils.log_setup import setup_logging
+
+_log = logging.getLogger(__name__)
+
+setup_logging()
+
+async def main(limit: int | None):
+    rabbit_repo: OutInRabbitMQRepositoryInterface = container.resolve(OutInRabbitMQRepositoryInterface)
+    try:
+        await rabbit_repo.connect_and_declare()
+        replayed = await rabbit_repo.replay_dead_letters(limit=limit)
+        _log.info("Dead-letter replay finished. Messages replayed: %s", replayed)
+    finally:
+        # Also stops the spool drainer and releases the spool segment claimed by connect_and_declare
+        await rabbit_repo.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move dead-lettered messages back to the inbound task queue.")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of messages to replay (default: all).")
+    args = parser.parse_args()
+    asyncio.run(main(limit=args.limit))
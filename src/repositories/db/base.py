@@ -1,25 +1,59 @@
+from functools import cache
+
 from sqlalchemy.ext.declarative import declarative_base
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from src.config import DatabaseConfig
+from src.utils.metrics import registry
+
+_pool_size = registry.gauge("db_pool_size", "Connections the database pool keeps open.")
+_pool_checked_out = registry.gauge("db_pool_checked_out", "Database connections currently in use.")
+_pool_overflow = registry.gauge("db_pool_overflow", "Database connections open above the pool size.")
+
+
+@cache
+def get_engine() -> AsyncEngine:
+    # Built on first use, so importing the models, the container or alembic's env does no database setup
+    engine = create_async_engine(
+        DatabaseConfig().database_url,
+        echo=False,
+        pool_size=10,
+        max_overflow=20,
+        pool_pre_ping=True,
+        connect_args={
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+        },
+    )
+    registry.add_collector(lambda: _collect_pool_metrics(engine))
+    return engine
+
+
+def _collect_pool_metrics(engine: AsyncEngine) -> None:
+    pool = engine.pool
+    _pool_size.set(pool.size())
+    _pool_checked_out.set(pool.checkedout())
+    _pool_overflow.set(max(0, pool.overflow()))
+
+
+@cache
+def get_session_factory() -> async_sessionmaker:
+    return async_sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=get_engine()
+    )
+
+
+def session_factory() -> AsyncSession:
+    return get_session_factory()()
+
+
+async def dispose_engine() -> None:
+    """Close the connection pool if the engine was ever created."""
+    if get_engine.cache_info().currsize:
+        await get_engine().dispose()
+
 
-db_url = DatabaseConfig().database_url
-engine = create_async_engine(
-    db_url,
-    echo=False,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    connect_args={
-        "statement_cache_size": 0,
-        "prepared_statement_cache_size": 0,
-    },
-)
-session_factory = async_sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    expire_on_commit=False,
-    bind=engine
-)
-
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
@@ -1,8 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 
-from src.config import DatabaseConfig
 from src.repositories.db.base import Base
 
 class RefreshToken(Base):
@@ -12,6 +11,6 @@ class RefreshToken(Base):
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
     token = Column(String, unique=True, index=True, nullable=False)
     expires_at = Column(DateTime(timezone=True), nullable=False)
-    created_at = Column(DateTime(timezone=True), default=DatabaseConfig().utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
 
     user = relationship("User", back_populates="refresh_tokens")
\ No newline at end of file
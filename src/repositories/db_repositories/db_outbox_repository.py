@@ -0,0 +1,44 @@
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import delete, select
+
+from src.repositories.db.models.outbox_event import OutboxEvent
+from src.repositories.db_repositories.db_repository import BaseRepository
+from src.usecases.interfaces.db_interfaces.db_outbox_interface import DBOutboxInterface
+from src.usecases.schemas.outbox_schemas import OutboxEventSchema
+
+
+class DBOutboxRepository(DBOutboxInterface, BaseRepository):
+    async def publish_pending_events(
+            self,
+            publish: Callable[[list[OutboxEventSchema]], Awaitable[None]],
+            batch_size: int,
+    ) -> int:
+        """
+        Lock the oldest pending events, publish them and delete them in one transaction.
+
+        Rows locked by another relay are skipped, so several workers can drain the
+        outbox concurrently. If publish raises, the transaction is rolled back and
+        the events stay in the outbox for the next attempt.
+
+        Returns:
+            int: Number of published events
+        """
+        async with self as repo:
+            query = (
+                select(OutboxEvent)
+                .order_by(OutboxEvent.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await repo._session.execute(query)
+            events = [OutboxEventSchema.model_validate(event) for event in result.scalars().all()]
+            if not events:
+                return 0
+
+            await publish(events)
+
+            await repo._session.execute(
+                delete(OutboxEvent).where(OutboxEvent.id.in_([event.id for event in events]))
+            )
+            return len(events)
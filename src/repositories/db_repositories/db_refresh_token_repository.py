@@ -1,14 +1,27 @@
 from datetime import datetime
 from typing import Union
 
-from sqlalchemy import select, update
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
 from src.repositories.db_repositories.db_repository import BaseRepository
 from src.repositories.db.models.refresh_token import RefreshToken
+from src.repositories.db_repositories.db_user_repository import DBUserRepository
+from src.usecases.interfaces.cache_interface import Cache
 from src.usecases.schemas.auth_schemas import RefreshTokenSchema
 from src.usecases.interfaces.db_interfaces.db_refresh_token_interface import DBRefreshTokenInterface
 
 
 class DBRefreshTokenRepository(DBRefreshTokenInterface, BaseRepository):
+    def __init__(self, session_factory: async_sessionmaker, cache: Cache) -> None:
+        super().__init__(session_factory)
+        self._cache = cache
+
+    async def _invalidate_user_token_cache(self, user_id: int) -> None:
+        # The refresh path reads the token from the cached user entry, see DBUserRepository.
+        # Called after the commit, so a concurrent refresh cannot cache the old token again
+        await self._cache.delete(DBUserRepository.with_token_cache_key(user_id))
+
     async def create_or_update_token(self, user_id: int, token: str, expires_at: datetime) -> RefreshTokenSchema:
         async with self as repo:
             stmt = update(RefreshToken).where(RefreshToken.user_id == user_id).values(
@@ -20,13 +33,15 @@ class DBRefreshTokenRepository(DBRefreshTokenInterface, BaseRepository):
             updated_token = result.scalars().first()
 
             if updated_token:
-                return RefreshTokenSchema.model_validate(updated_token)
+                token_schema = RefreshTokenSchema.model_validate(updated_token)
+            else:
+                new_token = RefreshToken(user_id=user_id, token=token, expires_at=expires_at)
+                repo._session.add(new_token)
+                await repo._session.flush()
+                token_schema = RefreshTokenSchema.model_validate(new_token)
 
-            new_token = RefreshToken(user_id=user_id, token=token, expires_at=expires_at)
-            repo._session.add(new_token)
-            await repo._session.flush()
-
-            return RefreshTokenSchema.model_validate(new_token)
+        await self._invalidate_user_token_cache(user_id)
+        return token_schema
 
     async def get_token_by_user_id(self, user_id: int) -> Union[RefreshTokenSchema, None]:
         async with self as repo:
@@ -35,4 +50,9 @@ class DBRefreshTokenRepository(DBRefreshTokenInterface, BaseRepository):
             token = result.scalars().first()
             if token:
                 return RefreshTokenSchema.model_validate(token)
-            return None
\ No newline at end of file
+            return None
+
+    async def delete_token_by_user_id(self, user_id: int) -> None:
+        async with self as repo:
+            await repo._session.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+        await self._invalidate_user_token_cache(user_id)
\ No newline at end of file
@@ -1,10 +1,12 @@
+from contextvars import ContextVar
 from sqlalchemy import delete
 from typing import Self, TypeVar
 from pydantic import BaseModel
-from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.repositories.db.base import Base
-from src.usecases.errors import NotFoundDatabaseError
+from src.repositories.db.models.outbox_event import OutboxEvent
+from src.usecases.errors import ClientNotInitializedError, NotFoundDatabaseError
 
 # Generic type for SQLAlchemy model classes
 _ModelType = TypeVar("_ModelType", bound=Base)
@@ -16,6 +18,10 @@ class BaseRepository:
 
     Implements async context manager pattern and basic CRUD operations
     with proper transaction handling and error management.
+
+    The open session is kept in a context variable rather than on the instance,
+    so one repository instance can be shared by concurrent requests: each
+    request (asyncio task) sees only the sessions it opened itself.
     """
 
     def __init__(self, session_factory: async_sessionmaker) -> None:
@@ -26,6 +32,21 @@ class BaseRepository:
             session_factory: Async session factory for database operations
         """
         self._session_factory = session_factory
+        # Stack of sessions opened by the current task, innermost last
+        self._sessions: ContextVar[tuple[AsyncSession, ...]] = ContextVar(
+            f"{type(self).__name__}_sessions", default=()
+        )
+
+    @property
+    def _session(self) -> AsyncSession:
+        """
+        Raises:
+            ClientNotInitializedError: If called outside of an `async with repository` block
+        """
+        sessions = self._sessions.get()
+        if not sessions:
+            raise ClientNotInitializedError(f"{type(self).__name__} session")
+        return sessions[-1]
 
     async def __aenter__(self) -> Self:
         """
@@ -34,7 +55,7 @@ class BaseRepository:
         Returns:
             Self: Repository instance with active database session
         """
-        self._session = self._session_factory()
+        self._sessions.set((*self._sessions.get(), self._session_factory()))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
@@ -56,7 +77,9 @@ class BaseRepository:
             await self._session.rollback()
             raise e
         finally:
-            await self._session.close()
+            session = self._session
+            self._sessions.set(self._sessions.get()[:-1])
+            await session.close()
 
     async def commit(self) -> None:
         """Explicitly commit current transaction."""
@@ -66,6 +89,20 @@ class BaseRepository:
         """Roll back current transaction."""
         await self._session.rollback()
 
+    def _add_outbox_event(self, event_type: str, payload: dict) -> None:
+        """
+        Stage a domain event in the outbox table within the current session.
+
+        Args:
+            event_type: Event type, used as the message type when published
+            payload: JSON-serializable event data
+
+        Notes:
+            The event is committed atomically with the change that produced it
+            and published to RabbitMQ later by the outbox relay
+        """
+        self._session.add(OutboxEvent(event_type=event_type, payload=payload))
+
     async def _delete(self, model: type[_ModelType], entity_id: int) -> None:
         """
         Delete entity by ID from specified model.
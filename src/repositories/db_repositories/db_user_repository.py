@@ -2,10 +2,13 @@ import logging
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from src.repositories.db.models.refresh_token import RefreshToken
 from src.repositories.db.models.user import User
 from src.repositories.db_repositories.db_repository import BaseRepository
 from src.usecases.interfaces.db_interfaces.db_user_interface import DBUserInterface
-from src.usecases.schemas.user_schemas import UserCreateSchema, UserSchema
+from src.usecases.schemas.auth_schemas import RefreshTokenSchema
+from src.usecases.schemas.outbox_schemas import DomainEventType
+from src.usecases.schemas.user_schemas import UserCreateSchema, UserSchema, UserWithTokenSchema
 from src.usecases.errors import NotFoundDatabaseError
 from src.usecases.interfaces.cache_interface import Cache
 
@@ -20,44 +23,72 @@ class DBUserRepository(DBUserInterface, BaseRepository):
         super().__init__(session_factory)
         self._cache = cache
 
+    @classmethod
+    def with_token_cache_key(cls, user_id: int) -> str:
+        """Cache key of the user with their refresh token; dropped whenever either changes."""
+        return f"{cls.ALL_USER_KEY_PREFIX}:with_token:{user_id}"
+
     async def _get_user_by_id_from_db(self, user_id: int) -> UserSchema:
-        _log.info(f"Attempting to fetch user with ID {user_id} from the database.")
+        _log.debug("Attempting to fetch user with ID %s from the database.", user_id)
         async with self as repo:
             query = select(User).where(User.id == user_id)
             result = await repo._session.execute(query)
             user = result.scalars().first()
 
             if not user:
-                _log.warning(f"User with ID {user_id} not found in DB.")
+                _log.warning("User with ID %s not found in DB.", user_id)
                 raise NotFoundDatabaseError(f"User with user_id {user_id} not found.")
 
-            _log.info(f"Successfully fetched user '{user.username}' (ID: {user_id}) from DB.")
+            _log.debug("Successfully fetched user '%s' (ID: %s) from DB.", user.username, user_id)
             return UserSchema.model_validate(user)
 
     async def _get_user_by_username_from_db(self, username: str) -> UserSchema:
-        _log.info(f"Attempting to fetch user with username '{username}' from the database.")
+        _log.debug("Attempting to fetch user with username '%s' from the database.", username)
         async with self as repo:
             query = select(User).where(User.username == username)
             result = await repo._session.execute(query)
             user = result.scalars().first()
 
             if not user:
-                _log.warning(f"User with username '{username}' not found in DB.")
+                _log.warning("User with username '%s' not found in DB.", username)
                 raise NotFoundDatabaseError(f"User with username {username} not found.")
 
-            _log.info(f"Successfully fetched user '{username}' from DB.")
+            _log.debug("Successfully fetched user '%s' from DB.", username)
             return UserSchema.model_validate(user)
 
+    async def _get_user_with_refresh_token_from_db(self, user_id: int) -> UserWithTokenSchema:
+        _log.debug("Attempting to fetch user with ID %s and their refresh token from the database.", user_id)
+        async with self as repo:
+            # One round trip over the User.refresh_tokens relationship; a user has at most one token
+            query = (
+                select(User, RefreshToken)
+                .outerjoin(User.refresh_tokens)
+                .where(User.id == user_id)
+                .order_by(RefreshToken.created_at.desc())
+                .limit(1)
+            )
+            row = (await repo._session.execute(query)).first()
+
+            if row is None:
+                _log.warning("User with ID %s not found in DB.", user_id)
+                raise NotFoundDatabaseError(f"User with user_id {user_id} not found.")
+
+            user, refresh_token = row
+            return UserWithTokenSchema(
+                **UserSchema.model_validate(user).model_dump(),
+                refresh_token=RefreshTokenSchema.model_validate(refresh_token) if refresh_token else None,
+            )
+
     async def _invalidate_user_cache(self, user: UserSchema | User):
         id_key = f"{self.ALL_USER_KEY_PREFIX}:id:{user.id}"
         username_key = f"{self.ALL_USER_KEY_PREFIX}:username:{user.username}"
-        _log.info(f"Invalidating cache for user ID: {user.id} and username: {user.username}.")
-        await self._cache.delete(id_key, username_key)
-        _log.debug(f"Cache keys deleted: {id_key}, {username_key}")
+        _log.debug("Invalidating cache for user ID: %s and username: %s.", user.id, user.username)
+        await self._cache.delete(id_key, username_key, self.with_token_cache_key(user.id))
+        _log.debug("Cache keys deleted: %s, %s", id_key, username_key)
 
     async def get_user_by_id(self, user_id: int) -> UserSchema:
         id_key = f"{self.ALL_USER_KEY_PREFIX}:id:{user_id}"
-        _log.debug(f"Attempting to get user by ID {user_id}. Cache key: {id_key}")
+        _log.debug("Attempting to get user by ID %s. Cache key: %s", user_id, id_key)
 
         user_schema_dict = await self._cache.get_cached_or_call(
             self._get_user_by_id_from_db,
@@ -65,12 +96,12 @@ class DBUserRepository(DBUserInterface, BaseRepository):
             key=id_key,
             ttl=self.EXPIRE_TIME,
         )
-        _log.info(f"Resolved user by ID {user_id} (from cache or DB).")
+        _log.debug("Resolved user by ID %s (from cache or DB).", user_id)
         return UserSchema.model_validate(user_schema_dict)
 
     async def get_user_by_username(self, username: str) -> UserSchema:
         username_key = f"{self.ALL_USER_KEY_PREFIX}:username:{username}"
-        _log.debug(f"Attempting to get user by username '{username}'. Cache key: {username_key}")
+        _log.debug("Attempting to get user by username '%s'. Cache key: %s", username, username_key)
 
         user_schema_dict = await self._cache.get_cached_or_call(
             self._get_user_by_username_from_db,
@@ -78,11 +109,20 @@ class DBUserRepository(DBUserInterface, BaseRepository):
             key=username_key,
             ttl=self.EXPIRE_TIME,
         )
-        _log.info(f"Resolved user by username '{username}' (from cache or DB).")
+        _log.debug("Resolved user by username '%s' (from cache or DB).", username)
         return UserSchema.model_validate(user_schema_dict)
 
+    async def get_user_with_refresh_token(self, user_id: int) -> UserWithTokenSchema:
+        user_schema_dict = await self._cache.get_cached_or_call(
+            self._get_user_with_refresh_token_from_db,
+            user_id,
+            key=self.with_token_cache_key(user_id),
+            ttl=self.EXPIRE_TIME,
+        )
+        return UserWithTokenSchema.model_validate(user_schema_dict)
+
     async def create_user(self, data: UserCreateSchema) -> UserSchema:
-        _log.info(f"Creating new user with username: {data.username}")
+        _log.info("Creating new user with username: %s", data.username)
         async with self as repo:
             new_user = User(
                 username=data.username,
@@ -92,14 +132,19 @@ class DBUserRepository(DBUserInterface, BaseRepository):
             repo._session.add(new_user)
             await repo._session.flush()
             user_schema = UserSchema.model_validate(new_user)
-            _log.info(f"New user created successfully. ID: {new_user.id}")
+            _log.info("New user created successfully. ID: %s", new_user.id)
+
+            repo._add_outbox_event(
+                DomainEventType.USER_CREATED.value,
+                {"user_id": user_schema.id, "username": user_schema.username, "role": user_schema.role.value},
+            )
 
             await self._invalidate_user_cache(user_schema)
 
             return user_schema
 
     async def update_user_password(self, user_id: int, new_password_hash: str) -> UserSchema:
-        _log.info(f"Updating password for user ID: {user_id}")
+        _log.info("Updating password for user ID: %s", user_id)
         async with self as repo:
             query = select(User).where(User.id == user_id)
 
@@ -107,11 +152,16 @@ class DBUserRepository(DBUserInterface, BaseRepository):
             user = result.scalars().first()
 
             if not user:
-                _log.warning(f"Cannot update password. User ID {user_id} not found.")
+                _log.warning("Cannot update password. User ID %s not found.", user_id)
                 raise NotFoundDatabaseError(f"User with user_id {user_id} not found.")
 
             user.hashed_password = new_password_hash
-            _log.info(f"Password for user ID {user_id} updated and flushed to DB.")
+            _log.info("Password for user ID %s updated and flushed to DB.", user_id)
+
+            repo._add_outbox_event(
+                DomainEventType.USER_PASSWORD_CHANGED.value,
+                {"user_id": user.id, "username": user.username},
+            )
 
             user_schema = UserSchema.model_validate(user)
             await self._invalidate_user_cache(user_schema)
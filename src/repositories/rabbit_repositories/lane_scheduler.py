@@ -0,0 +1,59 @@
+import asyncio
+from collections import deque
+from typing import Any
+
+
+class LaneScheduler:
+    """
+    Weighted fair queue over per-lane buffers.
+
+    Lanes are picked with smooth weighted round-robin: every pick adds each
+    non-empty lane's weight to its score, takes the lane with the highest score
+    and lowers that score by the total weight of the non-empty lanes. Under load
+    each lane gets a share proportional to its weight, interleaved rather than in
+    bursts, and an empty lane leaves its share to the others.
+    """
+
+    def __init__(self, weights: dict[str, int]) -> None:
+        self._weights = weights
+        self._buffers: dict[str, deque] = {lane: deque() for lane in weights}
+        self._scores = dict.fromkeys(weights, 0)
+        self._available = asyncio.Event()
+
+    def __len__(self) -> int:
+        return sum(len(buffer) for buffer in self._buffers.values())
+
+    def put(self, lane: str, item: Any) -> None:
+        self._buffers[lane].append(item)
+        self._available.set()
+
+    async def get(self) -> Any:
+        """Wait for an item and return it from the lane whose turn it is."""
+        while True:
+            lane = self._pick()
+            if lane is not None:
+                return self._buffers[lane].popleft()
+            self._available.clear()
+            await self._available.wait()
+
+    def drain(self) -> list[Any]:
+        """Remove and return every buffered item."""
+        items = [item for buffer in self._buffers.values() for item in buffer]
+        for buffer in self._buffers.values():
+            buffer.clear()
+        return items
+
+    def _pick(self) -> str | None:
+        best = None
+        total_weight = 0
+        for lane, buffer in self._buffers.items():
+            if not buffer:
+                continue
+            self._scores[lane] += self._weights[lane]
+            total_weight += self._weights[lane]
+            if best is None or self._scores[lane] > self._scores[best]:
+                best = lane
+
+        if best is not None:
+            self._scores[best] -= total_weight
+        return best
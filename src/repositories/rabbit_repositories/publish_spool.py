@@ -0,0 +1,227 @@
+import asyncio
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+from collections import deque
+from collections.abc import Awaitable, Callable
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import BinaryIO
+
+import aio_pika
+
+from src.usecases.errors import BrokerBackpressureError
+
+_log = logging.getLogger(__name__)
+
+# Frame header: metadata length and body length, both unsigned 32-bit big-endian
+_FRAME_HEADER = struct.Struct(">II")
+
+# Message properties stored as they are in the frame metadata; delivery_mode and timestamp are converted
+_MESSAGE_PROPERTIES = (
+    "headers",
+    "content_type",
+    "content_encoding",
+    "priority",
+    "correlation_id",
+    "reply_to",
+    "expiration",
+    "message_id",
+    "type",
+    "user_id",
+    "app_id",
+)
+
+
+class PublishSpool:
+    """
+    Bounded FIFO of outbound messages that could not be published yet.
+
+    Messages are kept in memory up to memory_limit entries. Further messages are
+    appended to a length-prefixed, append-only segment file that is read back
+    through mmap. Memory only accepts messages while the segment is empty, so
+    every in-memory message is older than every on-disk one and draining memory
+    first, then disk, preserves publish order.
+
+    Each process claims its own segment with an exclusive flock, so a restarted
+    process picks up and replays a segment left behind by a crashed one.
+    """
+
+    def __init__(self, directory: str, memory_limit: int, max_bytes: int, retry_after: int) -> None:
+        self._directory = Path(directory)
+        self._memory_limit = memory_limit
+        self._max_bytes = max_bytes
+        self._retry_after = retry_after
+
+        self._memory: deque[tuple[str, aio_pika.Message]] = deque()
+        self._memory_bytes = 0
+
+        self._segment: BinaryIO | None = None
+        self._offset_path: Path | None = None
+        self._read_offset = 0
+        self._write_offset = 0
+
+        self._disk_lock = asyncio.Lock()
+        self._drain_lock = asyncio.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._memory_bytes + self._write_offset - self._read_offset
+
+    @property
+    def is_empty(self) -> bool:
+        return self.size_bytes == 0
+
+    @property
+    def is_full(self) -> bool:
+        return self.size_bytes >= self._max_bytes
+
+    async def append(self, routing_key: str, message: aio_pika.Message) -> None:
+        """
+        Raises:
+            BrokerBackpressureError: If the spool has reached its high-water mark
+        """
+        if self.is_full:
+            raise BrokerBackpressureError(retry_after=self._retry_after)
+
+        if self._write_offset == self._read_offset and len(self._memory) < self._memory_limit:
+            self._memory.append((routing_key, message))
+            self._memory_bytes += message.body_size
+            return
+
+        frame = self._encode_frame(routing_key, message)
+        async with self._disk_lock:
+            await asyncio.to_thread(self._write_frame, frame)
+
+    async def load(self) -> None:
+        """Claim a segment file, picking up messages a previous process left behind."""
+        async with self._disk_lock:
+            await asyncio.to_thread(self._claim_segment)
+
+    async def drain(self, publish: Callable[[str, aio_pika.Message], Awaitable[None]], batch_size: int = 100) -> int:
+        """
+        Publish spooled messages in order until the spool is empty.
+
+        A message is removed only after publish returns, so a failure leaves it
+        at the head of the spool for the next attempt.
+
+        Returns:
+            int: Number of published messages
+        """
+        published = 0
+        async with self._drain_lock:
+            while self._memory:
+                routing_key, message = self._memory[0]
+                await publish(routing_key, message)
+                self._memory.popleft()
+                self._memory_bytes -= message.body_size
+                published += 1
+
+            while self._read_offset < self._write_offset:
+                frames = await asyncio.to_thread(self._read_frames, batch_size)
+                try:
+                    for routing_key, message, next_offset in frames:
+                        await publish(routing_key, message)
+                        self._read_offset = next_offset
+                        published += 1
+                finally:
+                    # Also after a failure halfway through the batch, so a restart does not resend its head
+                    async with self._disk_lock:
+                        await asyncio.to_thread(self._commit_read_offset)
+
+        return published
+
+    async def close(self) -> None:
+        """
+        Move the in-memory messages to the segment file, ahead of the ones already
+        there, commit the read offset and release the segment, so the next process
+        replays exactly the unpublished messages in order.
+        """
+        async with self._drain_lock, self._disk_lock:
+            if self._memory:
+                frames = b"".join(self._encode_frame(routing_key, message) for routing_key, message in self._memory)
+                await asyncio.to_thread(self._prepend_frames, frames)
+                _log.warning("Kept %s spooled messages on disk for the next start.", len(self._memory))
+                self._memory.clear()
+                self._memory_bytes = 0
+            elif self._segment is not None:
+                await asyncio.to_thread(self._commit_read_offset)
+
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+
+    def _claim_segment(self) -> None:
+        if self._segment is not None:
+            return
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+        index = 0
+        while True:
+            path = self._directory / f"spool-{index}.log"
+            segment = open(path, "a+b")
+            try:
+                fcntl.flock(segment.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                segment.close()
+                index += 1
+                continue
+            break
+
+        self._segment = segment
+        self._offset_path = path.with_suffix(".offset")
+        self._write_offset = os.fstat(segment.fileno()).st_size
+        self._read_offset = int(self._offset_path.read_text() or 0) if self._offset_path.exists() else 0
+        if self._write_offset > self._read_offset:
+            _log.warning("Recovered %s spooled bytes from %s", self._write_offset - self._read_offset, path)
+
+    def _write_frame(self, frame: bytes) -> None:
+        self._claim_segment()
+        self._segment.write(frame)
+        self._segment.flush()
+        self._write_offset += len(frame)
+
+    def _read_frames(self, limit: int) -> list[tuple[str, aio_pika.Message, int]]:
+        frames = []
+        offset = self._read_offset
+        with mmap.mmap(self._segment.fileno(), self._write_offset, access=mmap.ACCESS_READ) as view:
+            while offset < self._write_offset and len(frames) < limit:
+                meta_size, body_size = _FRAME_HEADER.unpack_from(view, offset)
+                meta_start = offset + _FRAME_HEADER.size
+                body_start = meta_start + meta_size
+                offset = body_start + body_size
+                meta = json.loads(view[meta_start:body_start])
+                if meta.get("timestamp") is not None:
+                    meta["timestamp"] = datetime.fromtimestamp(meta["timestamp"], UTC)
+                frames.append((meta.pop("routing_key"), aio_pika.Message(body=view[body_start:offset], **meta), offset))
+        return frames
+
+    def _prepend_frames(self, frames: bytes) -> None:
+        self._claim_segment()
+        self._segment.seek(self._read_offset)
+        pending = self._segment.read(self._write_offset - self._read_offset)
+        # The segment is opened in append mode, so rewrite it from the start
+        self._segment.truncate(0)
+        self._segment.write(frames + pending)
+        self._segment.flush()
+        self._read_offset, self._write_offset = 0, len(frames) + len(pending)
+        self._offset_path.write_text("0")
+
+    def _commit_read_offset(self) -> None:
+        if self._read_offset == self._write_offset:
+            # Everything on disk has been published, start the segment over
+            self._segment.truncate(0)
+            self._read_offset = self._write_offset = 0
+        self._offset_path.write_text(str(self._read_offset))
+
+    @staticmethod
+    def _encode_frame(routing_key: str, message: aio_pika.Message) -> bytes:
+        meta = {name: getattr(message, name) for name in _MESSAGE_PROPERTIES}
+        meta["routing_key"] = routing_key
+        meta["delivery_mode"] = int(message.delivery_mode)
+        meta["timestamp"] = message.timestamp.timestamp() if message.timestamp is not None else None
+        meta = json.dumps(meta, default=str).encode("utf-8")
+        return _FRAME_HEADER.pack(len(meta), len(message.body)) + meta + message.body
@@ -1,16 +1,44 @@
 import asyncio
-import json
 import logging
+import time
+import uuid
+import zlib
+from collections.abc import Sequence
 
 import aio_pika
+from aio_pika.abc import AbstractIncomingMessage
 
-from src.config import RabbitMQConfig
+from src.repositories.rabbit_repositories.lane_scheduler import LaneScheduler
+from src.repositories.rabbit_repositories.publish_spool import PublishSpool
 from src.repositories.rabbit_repositories.rabbit_repository import BaseRabbitMQRepository
+from src.usecases.errors import NonRetriableMessageError, UnknownLaneError
 from src.usecases.interfaces.rabbit_interfaces.rabbit_out_in_interface import OutInRabbitMQRepositoryInterface
+from src.usecases.schemas.message_schemas import InboundMessage
+from src.utils.concurrency_limiter import AdaptiveConcurrencyLimiter, LimiterSlot, current_slot
+from src.utils.message_codec import decode_message
+from src.utils.metrics import registry
 
 _log = logging.getLogger(__name__)
 
+_published = registry.counter(
+    "rabbitmq_messages_published_total", "Messages handed to push_task, by outcome.", ("outcome",)
+)
+_consumed = registry.counter(
+    "rabbitmq_messages_consumed_total", "Messages delivered to the consumer.", ("queue", "type")
+)
+_redelivered = registry.counter(
+    "rabbitmq_messages_redelivered_total", "Deliveries the broker flagged as redelivered.", ("queue",)
+)
+_acked = registry.counter("rabbitmq_messages_acked_total", "Acknowledged deliveries.", ("queue",))
+_queue_depth = registry.gauge("rabbitmq_queue_depth", "Ready messages in a queue at the last check.", ("queue",))
+_consumer_count = registry.gauge("rabbitmq_queue_consumers", "Consumers of a queue at the last check.", ("queue",))
+_spool_bytes = registry.gauge("rabbitmq_publish_spool_bytes", "Outbound messages waiting in the local spool.")
+_throughput = registry.gauge(
+    "rabbitmq_messages_consumed_per_second", "Consumed messages per second over the last check interval."
+)
+
 class OutInRabbitMQRepository(OutInRabbitMQRepositoryInterface, BaseRabbitMQRepository):
+    SHARD_QUEUE_ARGUMENTS = {'x-single-active-consumer': True}
 
     def __init__(self):
         super().__init__()
@@ -18,62 +46,645 @@ class OutInRabbitMQRepository(OutInRabbitMQRepositoryInterface, BaseRabbitMQRepo
         self.out_task_exchange = None
         self.in_task_queue = None
         self.in_task_exchange = None
+        self.in_lane_queues: dict[str, aio_pika.Queue] = {}
+        # Delivery tags handed to the consumer and not acked yet, see _settle_batch
+        self._unsettled: set[int] = set()
+        # Lane consumers and messages being handled, for the drain on shutdown
+        self._consumers: list[tuple[aio_pika.Queue, str]] = []
+        self._handlers: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        self._spool = PublishSpool(
+            directory=self._config.SPOOL_DIR,
+            memory_limit=self._config.SPOOL_MEMORY_MESSAGES,
+            max_bytes=self._config.SPOOL_MAX_BYTES,
+            retry_after=self._config.SPOOL_RETRY_AFTER,
+        )
+        self._spool_drainer: asyncio.Task | None = None
+        # Lanes and their queue names are fixed by the config, so the publish and consume paths only look them up
+        self._lane_weights = self._config.lane_weights
+        self._out_lane_queue_names = {
+            lane: self._lane_queue_name(self._config.OUT_TASK_QUEUE, lane) for lane in self._lane_weights
+        }
+        self._in_lane_queue_names = {
+            lane: self._lane_queue_name(self._config.IN_TASK_QUEUE, lane) for lane in self._lane_weights
+        }
+        self._retry_delays = self._config.retry_delays
+        self._shard_count = self._config.SHARD_COUNT
+        self._out_shard_queue_names = [
+            self._shard_queue_name(self._config.OUT_TASK_QUEUE, shard) for shard in range(self._shard_count)
+        ]
+        self._in_shard_queue_names = [
+            self._shard_queue_name(self._config.IN_TASK_QUEUE, shard) for shard in range(self._shard_count)
+        ]
+
+    def _collect_metrics(self) -> None:
+        super()._collect_metrics()
+        _spool_bytes.set(self._spool.size_bytes)
 
     async def connect_and_declare(self) -> None:
         await self.connect()
-        self.out_task_queue, self.out_task_exchange = await self._declare_queue_and_exchange(
-            RabbitMQConfig().OUT_TASK_QUEUE,
-            RabbitMQConfig().OUT_TASK_EXCHANGE,
-            self.channel
+        config = self._config
+        # One queue per priority lane; the default lane keeps the plain queue name
+        for lane in self._lane_weights:
+            out_queue, self.out_task_exchange = await self._declare_queue_and_exchange(
+                self._out_lane_queue_names[lane],
+                config.OUT_TASK_EXCHANGE,
+                self.channel
+            )
+            self.in_lane_queues[lane], self.in_task_exchange = await self._declare_queue_and_exchange(
+                self._in_lane_queue_names[lane],
+                config.IN_TASK_EXCHANGE,
+                self.channel,
+                retry_delays=self._retry_delays,
+            )
+            if lane == config.DEFAULT_LANE:
+                self.out_task_queue = out_queue
+        self.in_task_queue = self.in_lane_queues[config.DEFAULT_LANE]
+
+        # Shard queues for key-partitioned messages; only one consumer at a time may read a shard
+        for shard in range(self._shard_count):
+            await self._declare_queue_and_exchange(
+                self._out_shard_queue_names[shard],
+                config.OUT_TASK_EXCHANGE,
+                self.channel,
+                queue_arguments=self.SHARD_QUEUE_ARGUMENTS,
+            )
+            await self._declare_queue_and_exchange(
+                self._in_shard_queue_names[shard],
+                config.IN_TASK_EXCHANGE,
+                self.channel,
+                dead_letter=True,
+                queue_arguments=self.SHARD_QUEUE_ARGUMENTS,
+            )
+        _log.info(
+            "In-specific queues declared successfully for lanes %s and %s shards.",
+            list(self._lane_weights), self._shard_count,
         )
-        self.in_task_queue, self.in_task_exchange = await self._declare_queue_and_exchange(
-            RabbitMQConfig().IN_TASK_QUEUE,
-            RabbitMQConfig().IN_TASK_EXCHANGE,
-            self.channel
+
+        # Replay whatever was spooled while the broker was unavailable, including
+        # a segment left on disk by a previous process
+        await self._spool.load()
+        if not self._spool.is_empty:
+            self._start_spool_drainer()
+
+    async def push_task(
+            self,
+            payload: dict,
+            message_type: str | None = None,
+            message_id: str | None = None,
+            spool: bool = True,
+            lane: str | None = None,
+            partition_key: str | None = None,
+    ) -> None:
+        """
+        Publish a payload to the OUT exchange.
+
+        Args:
+            payload: Message data
+            message_type: Value for the AMQP type property, used by consumers for routing
+            message_id: Value for the AMQP message_id property, e.g. the id of the pushed task.
+                Consumers deduplicate by it, so a random id is generated when omitted
+            spool: Whether to spool the message when the broker is unavailable. Callers
+                that need a confirmed publish (e.g. the outbox relay) pass False and
+                get the publish error instead
+            lane: Priority lane to publish to, the default lane when omitted
+            partition_key: Key such as a user id. Messages with the same key go to the
+                same shard queue and are consumed in publish order; the lane is ignored
+
+        Raises:
+            BrokerBackpressureError: If the message has to be spooled but the spool is full
+            UnknownLaneError: If the lane is not configured
+        """
+        lane = lane or self._config.DEFAULT_LANE
+        if lane not in self._lane_weights:
+            raise UnknownLaneError(f"Unknown priority lane '{lane}'.")
+        message = self._build_message(
+            payload,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            type=message_type,
+            message_id=message_id or uuid.uuid4().hex,
+            headers={self.PUBLISHED_AT_HEADER: time.time()},
         )
-        _log.info("In-specific queues declared successfully.")
+        if partition_key is not None and self._shard_count > 0:
+            routing_key = self._out_shard_queue_names[self._shard_for(partition_key)]
+        else:
+            routing_key = self._out_lane_queue_names[lane]
 
-    async def push_task(self, payload: str) -> None:
-        try:
-            if self.channel is None:
-                _log.warning("Channel is closed or None. Reconnecting...")
-                await self.connect_and_declare()
+        if not spool:
+            await self._publish(routing_key, message)
+            _published.inc(outcome="published")
+            return
+
+        # Keep publish order: once anything is spooled, new messages queue up behind it
+        if self.out_task_exchange is None or not self._spool.is_empty:
+            await self._spool_message(routing_key, message)
+            _published.inc(outcome="spooled")
+            return
 
-            message = aio_pika.Message(
-                body=payload.encode("utf-8"),
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-                content_type='application/json'
+        try:
+            _log.debug(
+                "Publishing message to out_task_queue: %s bytes, %s, %s",
+                message.body_size, message.content_type, message.content_encoding or "uncompressed",
             )
-            _log.debug(f"Publishing message to out_task_queue: {payload[:100]}...")
+            await self._publish(routing_key, message)
+            _published.inc(outcome="published")
+        except Exception as e:
+            _log.warning("Failed to publish message to RabbitMQ: %s. Spooling it for later delivery.", e)
+            await self._spool_message(routing_key, message)
+            _published.inc(outcome="spooled")
+
+    async def _publish(self, routing_key: str, message: aio_pika.Message) -> None:
+        await asyncio.wait_for(
+            self.out_task_exchange.publish(message, routing_key),
+            timeout=self._config.PUBLISH_TIMEOUT,
+        )
 
-            await self.out_task_exchange.publish(message, RabbitMQConfig().OUT_TASK_QUEUE)
+    async def _spool_message(self, routing_key: str, message: aio_pika.Message) -> None:
+        """
+        Raises:
+            BrokerBackpressureError: If the spool is full and the message cannot be accepted
+        """
+        await self._spool.append(routing_key, message)
+        self._start_spool_drainer()
 
-        except Exception as e:
-            _log.error(f"Failed to publish message to RabbitMQ: {e}")
-            raise
+    def _start_spool_drainer(self) -> None:
+        if self._spool_drainer is None or self._spool_drainer.done():
+            self._spool_drainer = asyncio.create_task(self._drain_spool())
+
+    async def _drain_spool(self) -> None:
+        _log.warning("Broker unavailable, spooling outbound messages (%s bytes pending).", self._spool.size_bytes)
+        while not self._spool.is_empty:
+            try:
+                if self.out_task_exchange is None:
+                    await self.connect_and_declare()
+                published = await self._spool.drain(self._publish)
+                _log.info("Replayed %s spooled messages to RabbitMQ.", published)
+            except Exception as e:
+                _log.warning("Spool replay paused, broker still unavailable: %s", e)
+                await asyncio.sleep(self._config.RETRY_INTERVAL)
+        _log.info("Outbound spool drained.")
+
+    async def consume_tasks(
+            self,
+            on_message_callback=None,
+            concurrency: int = 1,
+            limiter: AdaptiveConcurrencyLimiter | None = None,
+    ) -> None:
+        """
+        Consume all priority lanes, handling up to concurrency messages at a time.
 
-    async def consume_tasks(self, on_message_callback=None) -> None:
+        Every lane prefetches messages into a LaneScheduler, and free handler
+        slots are filled by lane weight, so a backlog in a bulk lane cannot hold
+        back messages waiting in an interactive one. With a limiter the number of
+        slots adapts to handler latency and errors instead of staying at concurrency.
+        """
+        limiter = limiter or AdaptiveConcurrencyLimiter(initial=concurrency, floor=concurrency, ceiling=concurrency)
         while True:
             try:
-                _log.info(f"Starting message consumption from {RabbitMQConfig().IN_TASK_QUEUE}")
-                async with self.in_task_queue.iterator() as stream:
-                    async for message in stream:
+                _log.info(
+                    "Starting message consumption from %s (concurrency %s-%s, currently %s)",
+                    self._config.IN_TASK_QUEUE, limiter.floor, limiter.ceiling, limiter.limit,
+                )
+                # Prefetch up to the ceiling so the limit can grow without waiting for the broker
+                await self.channel.set_qos(prefetch_count=limiter.ceiling)
+                scheduler = LaneScheduler(self._lane_weights)
+                consumers = await self._consume_lanes(scheduler)
+                try:
+                    while True:
+                        await limiter.acquire()
                         try:
-                            async with message.process():
-                                data = json.loads(message.body)
-                                _log.info(f"Message received: {data}")
+                            lane, message = await scheduler.get()
+                        except BaseException:
+                            await limiter.release()
+                            raise
+                        if self._stopping.is_set():
+                            # Not started: left unacked, the broker requeues it when the connection closes
+                            await limiter.release()
+                            return
+                        self._track(self._handle_limited_message(message, on_message_callback, lane, limiter))
+                finally:
+                    await self._cancel_consumers(consumers)
 
-                                if on_message_callback:
-                                    await on_message_callback(data)
+            except aio_pika.AMQPException as e:
+                _log.error("AMQP error in consumer: %s, attempting reconnection...", e)
+                await self.connect_and_declare()
+            except Exception as e:
+                _log.error("Unexpected error in consumer: %s, restarting consumption...", e)
+                await asyncio.sleep(5)
 
-                        except json.JSONDecodeError as e:
-                            _log.error(f"Failed to parse message JSON: {e}, body: {message.body}")
-                        except Exception as e:
-                            _log.error(f"Error processing message: {e}")
+    async def _handle_limited_message(
+            self,
+            message: AbstractIncomingMessage,
+            on_message_callback,
+            lane: str,
+            limiter: AdaptiveConcurrencyLimiter,
+    ) -> None:
+        # Each handler runs in a task of its own, so the slot is visible to this message only
+        slot = LimiterSlot(limiter)
+        current_slot.set(slot)
+        error = None
+        try:
+            error = await self._handle_message(message, on_message_callback, lane)
+        finally:
+            # Messages that can never succeed say nothing about the load
+            overloaded = error is not None and not isinstance(error, NonRetriableMessageError)
+            if slot.held:
+                # Measured from when the handler got its slot back after any wait for its type's limit
+                await limiter.release(time.perf_counter() - slot.started, overloaded=overloaded)
+
+    async def consume_batches(self, on_batch_callback=None, batch_size: int = 100, batch_timeout: float = 0.5) -> None:
+        while True:
+            try:
+                _log.info(
+                    "Starting batch consumption from %s (batch_size=%s, batch_timeout=%ss)",
+                    self._config.IN_TASK_QUEUE, batch_size, batch_timeout,
+                )
+                # Let the broker deliver the next batch while the current one is being processed
+                await self.channel.set_qos(prefetch_count=batch_size * 2)
+                scheduler = LaneScheduler(self._lane_weights)
+                consumers = await self._consume_lanes(scheduler)
+                try:
+                    while True:
+                        batch = await self._collect_batch(scheduler, batch_size, batch_timeout)
+                        if self._stopping.is_set():
+                            return
+                        # Shielded, so cancelling the consumer never interrupts a batch halfway
+                        await asyncio.shield(self._track(self._process_batch(batch, on_batch_callback)))
+                finally:
+                    await self._cancel_consumers(consumers)
 
             except aio_pika.AMQPException as e:
-                _log.error(f"AMQP error in consumer: {e}, attempting reconnection...")
+                _log.error("AMQP error in batch consumer: %s, attempting reconnection...", e)
                 await self.connect_and_declare()
             except Exception as e:
-                _log.error(f"Unexpected error in consumer: {e}, restarting consumption...")
-                await asyncio.sleep(5)
\ No newline at end of file
+                _log.error("Unexpected error in batch consumer: %s, restarting consumption...", e)
+                await asyncio.sleep(5)
+
+    async def consume_partitions(self, on_message_callback=None, shards: Sequence[int] = ()) -> None:
+        """
+        Consume the given shard queues, strictly one message at a time per shard.
+
+        Messages with the same partition key therefore run in publish order while
+        different shards run in parallel. A failed message is retried in place with
+        the retry delays, holding back the rest of its shard, and is dead-lettered
+        once its attempts are exhausted. Shard queues are single-active-consumer,
+        so a second worker claiming the same shard only takes over if the first one
+        goes away.
+        """
+        if not shards:
+            return
+        while True:
+            try:
+                _log.info("Starting ordered consumption of shards %s", list(shards))
+                # A channel of its own, so the shard prefetch does not affect the lane consumers
+                channel = await self.connection.channel()
+                await channel.set_qos(prefetch_count=self._config.SHARD_PREFETCH_COUNT)
+                try:
+                    async with asyncio.TaskGroup() as consumers:
+                        for shard in shards:
+                            consumers.create_task(self._consume_shard(channel, shard, on_message_callback))
+                finally:
+                    await channel.close()
+                if self._stopping.is_set():
+                    return
+
+            except* aio_pika.AMQPException as e:
+                _log.error("AMQP error in shard consumer: %s, reopening the channel...", e.exceptions)
+                await asyncio.sleep(self._config.RETRY_INTERVAL)
+            except* Exception as e:
+                _log.error("Unexpected error in shard consumer: %s, restarting consumption...", e.exceptions)
+                await asyncio.sleep(5)
+
+    async def _consume_shard(self, channel, shard: int, on_message_callback=None) -> None:
+        queue_name = self._in_shard_queue_names[shard]
+        queue, _ = await self._declare_queue_and_exchange(
+            queue_name,
+            self._config.IN_TASK_EXCHANGE,
+            channel,
+            dead_letter=True,
+            queue_arguments=self.SHARD_QUEUE_ARGUMENTS,
+        )
+        async with queue.iterator() as stream:
+            async for message in stream:
+                if self._stopping.is_set():
+                    # Left unacked with the rest of the prefetched messages, so the shard keeps its order
+                    return
+                self._record_delivery(queue_name, message)
+                await asyncio.shield(self._track(self._handle_ordered_message(message, queue_name, on_message_callback)))
+
+    async def _handle_ordered_message(
+            self,
+            message: AbstractIncomingMessage,
+            queue_name: str,
+            on_message_callback=None,
+    ) -> None:
+        max_attempts = self._config.RETRY_MAX_ATTEMPTS
+        retry_delays = self._retry_delays
+        try:
+            inbound_message = self._decode_message(message)
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    if on_message_callback:
+                        await on_message_callback(inbound_message.model_copy(update={"attempt": attempt}))
+                    break
+                except NonRetriableMessageError:
+                    raise
+                except Exception as e:
+                    if attempt == max_attempts:
+                        raise
+                    delay_ms = retry_delays[min(attempt - 1, len(retry_delays) - 1)] if retry_delays else 1000
+                    _log.warning(
+                        "Attempt %s/%s failed for message %s in %s: %s, retrying in place in %s ms",
+                        attempt, max_attempts, message.message_id, queue_name, e, delay_ms,
+                    )
+                    await asyncio.sleep(delay_ms / 1000)
+
+        except Exception as e:
+            _log.error("Error processing ordered message: %s", e)
+            # No retry tiers: a retry queue would let later messages of the key overtake this one
+            await self._republish_failed(message, queue_name, e, retry_delays=(), max_attempts=max_attempts)
+
+        await message.ack()
+        _acked.inc(queue=queue_name)
+
+    async def _consume_lanes(self, scheduler: LaneScheduler) -> list[tuple[aio_pika.Queue, str]]:
+        # Tags of a previous channel are meaningless on the current one
+        self._unsettled.clear()
+
+        def deliver(lane: str, queue_name: str):
+            async def on_message(message: AbstractIncomingMessage) -> None:
+                self._record_delivery(queue_name, message)
+                self._unsettled.add(message.delivery_tag)
+                scheduler.put(lane, (lane, message))
+            return on_message
+
+        self._consumers = [
+            (queue, await queue.consume(deliver(lane, queue.name)))
+            for lane, queue in self.in_lane_queues.items()
+        ]
+        return self._consumers
+
+    def _track(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._handlers.add(task)
+        task.add_done_callback(self._handlers.discard)
+        return task
+
+    async def stop_consuming(self) -> None:
+        """Stop taking new messages; the ones being handled still finish and are acked."""
+        self._stopping.set()
+        await self._cancel_consumers(self._consumers)
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stop consuming and wait up to timeout seconds for the messages being handled.
+        Delivered messages that were not started stay unacked and go back to their
+        queue when the connection closes, so nothing is processed twice.
+
+        Returns:
+            bool: Whether every in-flight message finished in time
+        """
+        await self.stop_consuming()
+        if self._handlers:
+            _log.info("Waiting up to %ss for %s in-flight message handler(s)...", timeout, len(self._handlers))
+            _, pending = await asyncio.wait(self._handlers, timeout=timeout)
+            if pending:
+                _log.warning("%s message handler(s) did not finish in time, their messages will be redelivered.", len(pending))
+                return False
+        _log.info("All in-flight messages settled.")
+        return True
+
+    async def close(self) -> None:
+        """Flush the outbound spool for up to SPOOL_FLUSH_TIMEOUT seconds, keep the rest on disk and disconnect."""
+        if self._spool_drainer is not None and not self._spool_drainer.done():
+            _, pending = await asyncio.wait([self._spool_drainer], timeout=self._config.SPOOL_FLUSH_TIMEOUT)
+            if pending:
+                self._spool_drainer.cancel()
+                await asyncio.gather(self._spool_drainer, return_exceptions=True)
+        await self._spool.close()
+        await super().close()
+
+    @staticmethod
+    async def _cancel_consumers(consumers: list[tuple[aio_pika.Queue, str]]) -> None:
+        for queue, consumer_tag in consumers:
+            try:
+                await queue.cancel(consumer_tag)
+            except Exception as e:
+                _log.debug("Failed to cancel consumer %s: %s", consumer_tag, e)
+
+    @staticmethod
+    async def _collect_batch(
+            scheduler: LaneScheduler,
+            batch_size: int,
+            batch_timeout: float,
+    ) -> list[tuple[str, AbstractIncomingMessage]]:
+        """
+        Wait for the first message, then keep collecting until the batch is full
+        or batch_timeout seconds have passed since the first message arrived.
+        """
+        batch = [await scheduler.get()]
+        deadline = asyncio.get_running_loop().time() + batch_timeout
+
+        while len(batch) < batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(scheduler.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _handle_message(
+            self,
+            message: AbstractIncomingMessage,
+            on_message_callback=None,
+            lane: str | None = None,
+    ) -> Exception | None:
+        """
+        Run the callback for a single message. On failure the message is moved to
+        a delay queue or the dead-letter queue of its lane before the original is acked.
+
+        Returns:
+            Exception | None: The error the message failed with
+        """
+        error = None
+        try:
+            inbound_message = self._decode_message(message)
+            _log.debug("Message %s of type %s received", inbound_message.message_id, inbound_message.message_type)
+
+            if on_message_callback:
+                await on_message_callback(inbound_message)
+
+        except Exception as e:
+            _log.error("Error processing message: %s", e)
+            await self._republish_failed_inbound(message, e, lane)
+            error = e
+
+        self._unsettled.discard(message.delivery_tag)
+        await message.ack()
+        _acked.inc(queue=self._in_lane_queue_names[lane or self._config.DEFAULT_LANE])
+        return error
+
+    async def _process_batch(self, batch: list[tuple[str, AbstractIncomingMessage]], on_batch_callback=None) -> None:
+        """
+        Decode the batch, hand it to the callback and settle all of its messages,
+        with a single multiple-ack when possible. Failed messages are moved to the
+        retry topology first, so the ack never loses them.
+
+        The callback may return the errors of individual messages keyed by their
+        position in the batch it received; only those messages are retried. If it
+        raises, the whole batch is retried.
+        """
+        decoded = []
+        for lane, message in batch:
+            try:
+                decoded.append((lane, message, self._decode_message(message)))
+            except NonRetriableMessageError as e:
+                _log.error("%s (message %s, %s bytes)", e, message.message_id, message.body_size)
+                await self._republish_failed_inbound(message, e, lane)
+
+        failures: dict[int, Exception] = {}
+        try:
+            if decoded and on_batch_callback:
+                failures = await on_batch_callback([inbound_message for _, _, inbound_message in decoded]) or {}
+        except Exception as e:
+            _log.error("Error processing batch of %s messages: %s", len(batch), e)
+            failures = dict.fromkeys(range(len(decoded)), e)
+
+        if failures:
+            _log.warning("%s of %s messages in the batch failed.", len(failures), len(batch))
+            await asyncio.gather(*(
+                self._republish_failed_inbound(decoded[position][1], error, decoded[position][0])
+                for position, error in failures.items()
+            ))
+
+        await self._settle_batch([message for _, message in batch])
+        for lane, message in batch:
+            _acked.inc(queue=self._in_lane_queue_names[lane])
+
+    async def _settle_batch(self, messages: list[AbstractIncomingMessage]) -> None:
+        """
+        Ack a batch with one multiple-ack on its highest delivery tag when no
+        message outside the batch has a lower tag. Lanes share the channel, so
+        the scheduler can leave older deliveries of another lane buffered; the
+        batch is then acked message by message instead.
+        """
+        tags = {message.delivery_tag for message in messages}
+        self._unsettled -= tags
+        last = max(messages, key=lambda message: message.delivery_tag)
+
+        if not self._unsettled or min(self._unsettled) > last.delivery_tag:
+            await last.ack(multiple=True)
+            _log.info("Batch of %s messages settled with a single acknowledgement.", len(messages))
+        else:
+            await asyncio.gather(*(message.ack() for message in messages))
+            _log.info("Batch of %s messages settled.", len(messages))
+
+    @classmethod
+    def _decode_message(cls, message: AbstractIncomingMessage) -> InboundMessage:
+        return InboundMessage(
+            body=decode_message(message.body, message.content_type, message.content_encoding),
+            message_id=message.message_id,
+            message_type=message.type,
+            attempt=int((message.headers or {}).get(cls.ATTEMPT_HEADER, 1)),
+            redelivered=bool(message.redelivered),
+            published_at=(message.headers or {}).get(cls.PUBLISHED_AT_HEADER),
+        )
+
+    async def _republish_failed_inbound(
+            self,
+            message: AbstractIncomingMessage,
+            error: Exception,
+            lane: str | None = None,
+    ) -> None:
+        await self._republish_failed(
+            message,
+            self._in_lane_queue_names[lane or self._config.DEFAULT_LANE],
+            error,
+            retry_delays=self._retry_delays,
+            max_attempts=self._config.RETRY_MAX_ATTEMPTS,
+        )
+
+    async def monitor_queues(self, interval: float = 15.0) -> None:
+        """
+        Periodically read the depth and consumer count of every inbound queue with
+        a passive declare and update the queue gauges and the throughput gauge.
+        """
+        previous_consumed = self._consumed_total()
+        while True:
+            await asyncio.sleep(interval)
+            consumed = self._consumed_total()
+            _throughput.set(round((consumed - previous_consumed) / interval, 3))
+            previous_consumed = consumed
+
+            try:
+                # A passive declare of a missing queue closes the channel, so use a throwaway one
+                channel = await self.connection.channel()
+                try:
+                    for queue_name in self._inbound_queue_names():
+                        for name in (queue_name, self._dead_letter_queue_name(queue_name)):
+                            queue = await channel.declare_queue(name, passive=True)
+                            _queue_depth.set(queue.declaration_result.message_count, queue=name)
+                            _consumer_count.set(queue.declaration_result.consumer_count, queue=name)
+                finally:
+                    await channel.close()
+            except Exception as e:
+                _log.warning("Failed to read queue depths: %s", e)
+
+    @staticmethod
+    def _record_delivery(queue_name: str, message: AbstractIncomingMessage) -> None:
+        _consumed.inc(queue=queue_name, type=message.type or "")
+        if message.redelivered:
+            _redelivered.inc(queue=queue_name)
+
+    @staticmethod
+    def _consumed_total() -> float:
+        return sum(value for _, _, value in _consumed.samples())
+
+    def _inbound_queue_names(self) -> list[str]:
+        return [*self._in_lane_queue_names.values(), *self._in_shard_queue_names]
+
+    async def replay_dead_letters(self, limit: int | None = None) -> int:
+        """
+        Move dead-lettered messages of every lane and shard back to their inbound
+        queue with a fresh attempt counter.
+
+        Returns:
+            int: Number of replayed messages
+        """
+        replayed = 0
+        for queue_name in self._inbound_queue_names():
+            dead_letter_queue = await self.channel.declare_queue(self._dead_letter_queue_name(queue_name), durable=True)
+            lane_replayed = 0
+            while limit is None or replayed < limit:
+                message = await dead_letter_queue.get(no_ack=False, fail=False)
+                if message is None:
+                    break
+
+                headers = {
+                    key: value for key, value in (message.headers or {}).items()
+                    if key not in (self.ATTEMPT_HEADER, self.ERROR_HEADER, "x-death")
+                }
+                await self.in_task_exchange.publish(self._copy_message(message, headers), routing_key=queue_name)
+                await message.ack()
+                replayed += 1
+                lane_replayed += 1
+
+            if lane_replayed:
+                _log.info("Replayed %s dead-lettered messages to %s", lane_replayed, queue_name)
+        return replayed
+
+    def _lane_queue_name(self, queue_name: str, lane: str) -> str:
+        if lane == self._config.DEFAULT_LANE:
+            return queue_name
+        return f"{queue_name}.{lane}"
+
+    @staticmethod
+    def _shard_queue_name(queue_name: str, shard: int) -> str:
+        return f"{queue_name}.shard.{shard}"
+
+    def _shard_for(self, partition_key: str) -> int:
+        # crc32 rather than hash(): it must be stable across processes and restarts
+        return zlib.crc32(partition_key.encode("utf-8")) % self._shard_count
@@ -1,34 +1,96 @@
 import logging
+from collections.abc import Sequence
+
 import aio_pika
+from aio_pika.abc import AbstractMessage
 
-from tenacity import retry, stop_after_delay, wait_fixed
+from tenacity import AsyncRetrying, stop_after_delay, wait_exponential_jitter
 from src.config import RabbitMQConfig
+from src.usecases.retry_policy import will_retry
+from src.utils.message_codec import encode_message, resolve_compression, resolve_content_type
+from src.utils.metrics import registry
 
 _log = logging.getLogger(__name__)
 
+_retried = registry.counter("rabbitmq_messages_retried_total", "Failed messages sent to a retry tier.", ("queue",))
+_dead_lettered = registry.counter(
+    "rabbitmq_messages_dead_lettered_total", "Failed messages sent to the dead-letter queue.", ("queue",)
+)
+_connection_open = registry.gauge(
+    "rabbitmq_connection_open", "Whether the RabbitMQ connection of a repository is open.", ("connection",)
+)
+
 
 class BaseRabbitMQRepository:
+    ATTEMPT_HEADER = "x-attempt"
+    ERROR_HEADER = "x-last-error"
+    PUBLISHED_AT_HEADER = "x-published-at"
+
     def __init__(self):
         self.connection = None
         self.channel = None
+        # Read once: every construction of the settings re-reads the environment and .env
+        self._config = RabbitMQConfig()
+        self._content_type = resolve_content_type(self._config.MESSAGE_CONTENT_TYPE)
+        self._compression = resolve_compression(self._config.MESSAGE_COMPRESSION)
+        self._compression_threshold = self._config.MESSAGE_COMPRESSION_THRESHOLD
+        registry.add_collector(self._collect_metrics)
+
+    def _collect_metrics(self) -> None:
+        is_open = self.connection is not None and not self.connection.is_closed
+        _connection_open.set(int(is_open), connection=type(self).__name__)
 
-    @retry(
-        stop=stop_after_delay(RabbitMQConfig().CONNECTION_TIMEOUT),
-        wait=wait_fixed(RabbitMQConfig().RETRY_INTERVAL)
-    )
     async def connect(self) -> None:
-        try:
-            _log.debug(f"Connecting to RabbitMQ: {RabbitMQConfig().URL}")
-            self.connection = await aio_pika.connect_robust(RabbitMQConfig().URL)
-            self.channel = await self.connection.channel()
-            _log.info("Successfully connected to RabbitMQ")
-        except Exception as e:
-            _log.error(f"RabbitMQ connection failed: {e}")
-            raise
+        config = self._config
+        # Short first waits: on a cold start the broker is usually up after a fraction of a second
+        async for attempt in AsyncRetrying(
+            stop=stop_after_delay(config.CONNECTION_TIMEOUT),
+            wait=wait_exponential_jitter(initial=0.1, max=config.RETRY_INTERVAL, jitter=0.1),
+            reraise=True,
+        ):
+            with attempt:
+                try:
+                    _log.debug("Connecting to RabbitMQ: %s:%s", config.HOST, config.PORT)
+                    self.connection = await aio_pika.connect_robust(config.URL)
+                    self.channel = await self.connection.channel()
+                    _log.info("Successfully connected to RabbitMQ")
+                except Exception as e:
+                    _log.error("RabbitMQ connection failed: %s", e)
+                    raise
+
+    async def close(self) -> None:
+        if self.connection is not None and not self.connection.is_closed:
+            await self.connection.close()
+            _log.info("%s connection closed", type(self).__name__)
 
     @staticmethod
-    async def _declare_queue_and_exchange(queue_name: str, exchange_name: str, channel) -> (aio_pika.Queue, aio_pika.Exchange):
-        _log.debug(f"Declaring queue {queue_name} and exchange {exchange_name}")
+    def _retry_queue_name(queue_name: str, delay_ms: int) -> str:
+        return f"{queue_name}.retry.{delay_ms}"
+
+    @staticmethod
+    def _dead_letter_queue_name(queue_name: str) -> str:
+        return f"{queue_name}.dead"
+
+    @classmethod
+    async def _declare_queue_and_exchange(
+            cls,
+            queue_name: str,
+            exchange_name: str,
+            channel,
+            retry_delays: Sequence[int] = (),
+            dead_letter: bool = False,
+            queue_arguments: dict | None = None,
+    ) -> (aio_pika.Queue, aio_pika.Exchange):
+        """
+        Declare a durable direct exchange and a queue bound to it by the queue name.
+
+        When retry_delays is given, also declare one delay queue per tier and a
+        dead-letter queue. A delay queue holds a message for its TTL and then
+        dead-letters it back to exchange_name with queue_name as the routing key,
+        so a failed message re-enters the main queue without any consumer polling.
+        dead_letter declares only the dead-letter queue.
+        """
+        _log.debug("Declaring queue %s and exchange %s", queue_name, exchange_name)
         exchange = await channel.declare_exchange(
             exchange_name,
             aio_pika.ExchangeType.DIRECT,
@@ -38,8 +100,86 @@ class BaseRabbitMQRepository:
         queue = await channel.declare_queue(
             queue_name,
             durable=True,
-            arguments={'x-max-priority': 1}
+            arguments={'x-max-priority': 1, **(queue_arguments or {})}
         )
         await queue.bind(exchange, routing_key=queue_name)
-        _log.debug(f"Queue {queue_name} and exchange {exchange_name} declared successfully")
-        return queue, exchange
\ No newline at end of file
+
+        for delay_ms in retry_delays:
+            await channel.declare_queue(
+                cls._retry_queue_name(queue_name, delay_ms),
+                durable=True,
+                arguments={
+                    'x-message-ttl': delay_ms,
+                    'x-dead-letter-exchange': exchange_name,
+                    'x-dead-letter-routing-key': queue_name,
+                }
+            )
+        if retry_delays or dead_letter:
+            await channel.declare_queue(cls._dead_letter_queue_name(queue_name), durable=True)
+            _log.debug("Retry tiers %s ms and dead-letter queue declared for %s", list(retry_delays), queue_name)
+
+        _log.debug("Queue %s and exchange %s declared successfully", queue_name, exchange_name)
+        return queue, exchange
+
+    def _build_message(self, payload, **properties) -> aio_pika.Message:
+        """Encode payload with the configured content type and compression into a message."""
+        body, content_type, content_encoding = encode_message(
+            payload,
+            content_type=self._content_type,
+            compression=self._compression,
+            compression_threshold=self._compression_threshold,
+        )
+        return aio_pika.Message(
+            body=body,
+            content_type=content_type,
+            content_encoding=content_encoding,
+            **properties,
+        )
+
+    @staticmethod
+    def _copy_message(message: AbstractMessage, headers: dict) -> aio_pika.Message:
+        return aio_pika.Message(
+            body=message.body,
+            headers=headers,
+            content_type=message.content_type,
+            content_encoding=message.content_encoding,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            priority=message.priority,
+            correlation_id=message.correlation_id,
+            message_id=message.message_id,
+            timestamp=message.timestamp,
+            type=message.type,
+            app_id=message.app_id,
+        )
+
+    async def _republish_failed(
+            self,
+            message: AbstractMessage,
+            queue_name: str,
+            error: Exception,
+            retry_delays: Sequence[int],
+            max_attempts: int,
+    ) -> None:
+        """
+        Route a failed message to the next delay tier or, once max_attempts is
+        reached (or the error is not retriable), to the dead-letter queue.
+
+        The caller is responsible for acknowledging the original message after
+        this returns, so the message is never lost between the two steps.
+        """
+        headers = dict(message.headers or {})
+        attempt = int(headers.get(self.ATTEMPT_HEADER, 1))
+        headers[self.ERROR_HEADER] = f"{type(error).__name__}: {error}"[:1000]
+
+        if will_retry(error, attempt, max_attempts, retry_delays):
+            delay_ms = retry_delays[min(attempt - 1, len(retry_delays) - 1)]
+            headers[self.ATTEMPT_HEADER] = attempt + 1
+            routing_key = self._retry_queue_name(queue_name, delay_ms)
+            _retried.inc(queue=queue_name)
+            _log.warning("Attempt %s/%s failed for message %s, retrying in %s ms", attempt, max_attempts, message.message_id, delay_ms)
+        else:
+            routing_key = self._dead_letter_queue_name(queue_name)
+            _dead_lettered.inc(queue=queue_name)
+            _log.error("Message %s dead-lettered after %s attempt(s): %s", message.message_id, attempt, error)
+
+        await self.channel.default_exchange.publish(self._copy_message(message, headers), routing_key=routing_key)
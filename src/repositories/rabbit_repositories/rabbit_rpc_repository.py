@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import aio_pika
+from aio_pika.abc import AbstractIncomingMessage
+
+from src.repositories.rabbit_repositories.rabbit_repository import BaseRabbitMQRepository
+from src.usecases.errors import MessageDecodeError, RPCError, RPCTimeoutError
+from src.usecases.interfaces.rabbit_interfaces.rabbit_rpc_interface import RPCRabbitMQRepositoryInterface
+from src.utils.message_codec import decode_message
+from src.utils.metrics import registry
+
+_log = logging.getLogger(__name__)
+
+_pending_calls = registry.gauge("rabbitmq_rpc_pending_calls", "RPC calls waiting for a reply.")
+_active_responders = registry.gauge("rabbitmq_rpc_active_responders", "RPC requests being handled by this process.")
+
+
+class RPCRabbitMQRepository(RPCRabbitMQRepositoryInterface, BaseRabbitMQRepository):
+    """
+    Request/reply over RabbitMQ.
+
+    The client side publishes requests with a correlation id and reply_to set to
+    RabbitMQ's direct reply-to pseudo-queue, and resolves the matching future
+    when the reply arrives, so any number of calls can be in flight on one channel.
+    The server side consumes the RPC queue and publishes each handler result back
+    to the caller's reply_to address.
+    """
+    REPLY_TO_QUEUE = "amq.rabbitmq.reply-to"
+    STATUS_HEADER = "x-rpc-status"
+
+    def __init__(self):
+        super().__init__()
+        self.rpc_queue = None
+        self.rpc_exchange = None
+        self._pending: dict[str, asyncio.Future] = {}
+        self._responders: set[asyncio.Task] = set()
+
+    def _collect_metrics(self) -> None:
+        super()._collect_metrics()
+        _pending_calls.set(len(self._pending))
+        _active_responders.set(len(self._responders))
+
+    async def connect_and_declare(self) -> None:
+        await self.connect()
+        self.rpc_queue, self.rpc_exchange = await self._declare_queue_and_exchange(
+            self._config.RPC_QUEUE,
+            self._config.RPC_EXCHANGE,
+            self.channel
+        )
+        # Direct reply-to must be consumed in no-ack mode on the channel that publishes the requests
+        reply_queue = await self.channel.get_queue(self.REPLY_TO_QUEUE, ensure=False)
+        await reply_queue.consume(self._on_reply, no_ack=True)
+        _log.info("RPC queue declared and reply consumer started.")
+
+    async def call(self, method: str, payload: Any, timeout: float | None = None) -> Any:
+        """
+        Send an RPC request and wait for its reply.
+
+        Raises:
+            RPCTimeoutError: If no reply arrives within timeout seconds
+            RPCError: If the remote handler failed
+        """
+        timeout = timeout or self._config.RPC_TIMEOUT
+        correlation_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._pending[correlation_id] = future
+
+        try:
+            message = self._build_message(
+                payload,
+                correlation_id=correlation_id,
+                reply_to=self.REPLY_TO_QUEUE,
+                type=method,
+                # Let the broker drop requests nobody picked up before the caller gave up
+                expiration=timeout,
+            )
+            _log.debug("Sending RPC call '%s' (correlation_id=%s)", method, correlation_id)
+            await self.rpc_exchange.publish(message, self._config.RPC_QUEUE)
+            return await asyncio.wait_for(future, timeout=timeout)
+
+        except asyncio.TimeoutError:
+            raise RPCTimeoutError(f"RPC call '{method}' timed out after {timeout}s.")
+        finally:
+            self._pending.pop(correlation_id, None)
+
+    async def _on_reply(self, message: AbstractIncomingMessage) -> None:
+        future = self._pending.get(message.correlation_id)
+        if future is None or future.done():
+            _log.debug("Dropping late or unknown RPC reply (correlation_id=%s)", message.correlation_id)
+            return
+
+        try:
+            data = decode_message(message.body, message.content_type, message.content_encoding)
+        except MessageDecodeError as e:
+            future.set_exception(RPCError(str(e)))
+            return
+
+        if (message.headers or {}).get(self.STATUS_HEADER) == "error":
+            # The body of an error reply is {"error": ...}; anything else still fails the call rather than the consumer
+            error = data.get("error") if isinstance(data, dict) else None
+            future.set_exception(RPCError(str(error) if error else "Unknown RPC error"))
+        else:
+            future.set_result(data)
+
+    async def serve(self, handler: Callable[[str, Any], Awaitable[Any]]) -> None:
+        """
+        Consume the RPC queue and answer every request with handler(method, payload).
+
+        Requests are handled concurrently, bounded by RPC_PREFETCH_COUNT.
+        """
+        while True:
+            try:
+                _log.info("Serving RPC calls from %s", self._config.RPC_QUEUE)
+                await self.channel.set_qos(prefetch_count=self._config.RPC_PREFETCH_COUNT)
+                async with self.rpc_queue.iterator() as stream:
+                    async for message in stream:
+                        task = asyncio.create_task(self._respond(message, handler))
+                        self._responders.add(task)
+                        task.add_done_callback(self._responders.discard)
+
+            except aio_pika.AMQPException as e:
+                _log.error("AMQP error in RPC server: %s, attempting reconnection...", e)
+                await self.connect_and_declare()
+            except Exception as e:
+                _log.error("Unexpected error in RPC server: %s, restarting consumption...", e)
+                await asyncio.sleep(5)
+
+    async def close(self) -> None:
+        """Let the requests being answered reply, fail the calls still waiting and close the connection."""
+        if self._responders:
+            await asyncio.wait(self._responders, timeout=self._config.RPC_TIMEOUT)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RPCError("RPC client is shutting down."))
+        await super().close()
+
+    async def _respond(self, message: AbstractIncomingMessage, handler: Callable[[str, Any], Awaitable[Any]]) -> None:
+        if not message.reply_to:
+            _log.warning("RPC request '%s' has no reply_to, dropping it.", message.type)
+            await message.ack()
+            return
+
+        try:
+            payload = decode_message(message.body, message.content_type, message.content_encoding)
+            result = await handler(message.type, payload)
+            status = "ok"
+        except Exception as e:
+            _log.error("RPC handler for '%s' failed: %s", message.type, e)
+            result = {"error": str(e)}
+            status = "error"
+
+        try:
+            reply = self._build_message(
+                result,
+                correlation_id=message.correlation_id,
+                headers={self.STATUS_HEADER: status},
+            )
+            await self.channel.default_exchange.publish(reply, routing_key=message.reply_to)
+        finally:
+            await message.ack()
@@ -0,0 +1,81 @@
+import logging
+import uuid
+from collections import Counter, OrderedDict
+
+from src.repositories.redis_repository import RedisCacheRepository
+from src.usecases.interfaces.idempotency_interface import IdempotencyInterface
+from src.usecases.schemas.message_schemas import ClaimResult
+
+_log = logging.getLogger(__name__)
+
+# Delete the lease only if this process still holds it; it may have expired and been claimed elsewhere
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisIdempotencyRepository(IdempotencyInterface, RedisCacheRepository):
+    """
+    Idempotency window for consumed messages, keyed by message_id.
+
+    A message id is claimed with SET NX and a short lease while it is processed,
+    then marked as done for the dedup window. Ids completed by this process are
+    also kept in a bounded local LRU, so most redeliveries after a reconnect are
+    dropped without a Redis round trip.
+    """
+    KEY_PREFIX = "dedup"
+    DONE = "done"
+
+    def __init__(self, window: int, lease: int, local_size: int, prefix: str = "", **redis_kwargs) -> None:
+        super().__init__(prefix=prefix, **redis_kwargs)
+        self._window = window
+        self._lease = lease
+        self._local_size = local_size
+        self._local: OrderedDict[str, None] = OrderedDict()
+        self._lease_value = f"processing:{uuid.uuid4().hex}"
+        self._stats: Counter[str] = Counter()
+
+    def _key(self, message_id: str) -> str:
+        return f"{self.prefix}{self.KEY_PREFIX}:{message_id}"
+
+    async def claim(self, message_id: str) -> ClaimResult:
+        if message_id in self._local:
+            self._local.move_to_end(message_id)
+            self._stats["duplicates_local"] += 1
+            return ClaimResult.DUPLICATE
+
+        if await self._client.set(self._key(message_id), self._lease_value, nx=True, ex=self._lease):
+            self._stats["claimed"] += 1
+            return ClaimResult.CLAIMED
+        holder = await self._client.get(self._key(message_id))
+
+        if holder == self.DONE:
+            self._remember(message_id)
+            self._stats["duplicates_redis"] += 1
+            return ClaimResult.DUPLICATE
+        if holder is None:
+            # The lease expired between SET and GET, try again
+            return await self.claim(message_id)
+        self._stats["in_progress"] += 1
+        return ClaimResult.IN_PROGRESS
+
+    async def complete(self, message_id: str) -> None:
+        await self._client.set(self._key(message_id), self.DONE, ex=self._window)
+        self._remember(message_id)
+
+    async def release(self, message_id: str) -> None:
+        await self._client.eval(_RELEASE_SCRIPT, 1, self._key(message_id), self._lease_value)
+
+    def get_stats(self) -> dict[str, int]:
+        stats = dict(self._stats)
+        stats["duplicates_dropped"] = self._stats["duplicates_local"] + self._stats["duplicates_redis"]
+        return stats
+
+    def _remember(self, message_id: str) -> None:
+        self._local[message_id] = None
+        self._local.move_to_end(message_id)
+        if len(self._local) > self._local_size:
+            self._local.popitem(last=False)
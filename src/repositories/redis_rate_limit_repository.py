@@ -0,0 +1,105 @@
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from src.repositories.redis_repository import RedisCacheRepository
+from src.usecases.interfaces.rate_limit_interface import RateLimitInterface
+from src.usecases.schemas.rate_limit_schemas import TokenBucket
+
+_log = logging.getLogger(__name__)
+
+# Refill every bucket from the time elapsed since its last update, then take a token
+# from all of them or, if any is empty, from none. Returns {0, 0} on success, otherwise
+# the wait in ms of the emptiest bucket and its 1-based index. Uses the server clock,
+# so API processes with skewed clocks share one view of the buckets.
+_ACQUIRE_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local tokens = {}
+local wait_ms, blocking = 0, 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = capacity
+    if state[1] then
+        available = math.min(capacity, tonumber(state[1]) + (now_ms - tonumber(state[2])) * rate)
+    end
+    tokens[i] = available
+    if available < 1 then
+        local wait = math.ceil((1 - available) / rate)
+        if wait > wait_ms then
+            wait_ms, blocking = wait, i
+        end
+    end
+end
+if wait_ms > 0 then
+    return {wait_ms, blocking}
+end
+for i, key in ipairs(KEYS) do
+    redis.call('HSET', key, 'tokens', tostring(tokens[i] - 1), 'ts', now_ms)
+    -- A bucket left alone until it is full again is the same as no bucket
+    redis.call('PEXPIRE', key, math.ceil(tonumber(ARGV[2 * i - 1]) / tonumber(ARGV[2 * i])))
+end
+return {0, 0}
+"""
+
+
+class RedisRateLimitRepository(RateLimitInterface, RedisCacheRepository):
+    """
+    Token buckets shared by all API processes, updated atomically by one Lua script.
+
+    A key the script has rejected is also remembered locally until it would have a
+    token again, so a client hammering a blocked key is turned away without a
+    Redis round trip. The local map is bounded and evicts the oldest entries.
+    """
+    KEY_PREFIX = "ratelimit"
+
+    def __init__(self, local_size: int = 10_000, prefix: str = "", **redis_kwargs) -> None:
+        super().__init__(prefix=prefix, **redis_kwargs)
+        self._local_size = local_size
+        # Key -> time.monotonic() at which it has a token again
+        self._blocked: OrderedDict[str, float] = OrderedDict()
+        self._script = None
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{self.KEY_PREFIX}:{key}"
+
+    async def acquire(self, buckets: Sequence[TokenBucket]) -> float:
+        now = time.monotonic()
+        local_wait = self._blocked_for(buckets, now)
+        if local_wait > 0:
+            return local_wait
+
+        if self._script is None:
+            # Runs by EVALSHA and only sends the source again after a script cache flush
+            self._script = self._client.register_script(_ACQUIRE_SCRIPT)
+        args = []
+        for bucket in buckets:
+            args += [bucket.capacity, bucket.refill_per_second / 1000]
+        wait_ms, blocking = await self._script(keys=[self._key(bucket.key) for bucket in buckets], args=args)
+
+        if not wait_ms:
+            return 0.0
+        wait = int(wait_ms) / 1000
+        self._block(buckets[int(blocking) - 1].key, now + wait)
+        return wait
+
+    def _blocked_for(self, buckets: Sequence[TokenBucket], now: float) -> float:
+        wait = 0.0
+        for bucket in buckets:
+            until = self._blocked.get(bucket.key)
+            if until is None:
+                continue
+            if until <= now:
+                del self._blocked[bucket.key]
+            else:
+                wait = max(wait, until - now)
+        return wait
+
+    def _block(self, key: str, until: float) -> None:
+        self._blocked[key] = until
+        self._blocked.move_to_end(key)
+        if len(self._blocked) > self._local_size:
+            self._blocked.popitem(last=False)
@@ -5,33 +5,55 @@ from typing import Self, Any
 
 from redis.asyncio import Redis
 
-from src.usecases.errors import ClientNotInitializedError
 from src.usecases.interfaces.cache_interface import Cache
+from src.utils.metrics import registry
+
+_pool_connections = registry.gauge(
+    "redis_pool_connections", "Connections of the shared Redis pool by state.", ("state",)
+)
+
+
+def register_pool_metrics(client: Redis) -> None:
+    """Report the connection usage of client's pool on every metrics scrape."""
+
+    def collect() -> None:
+        pool = client.connection_pool
+        # redis-py keeps no public counters for these
+        _pool_connections.set(len(pool._in_use_connections), state="in_use")
+        _pool_connections.set(len(pool._available_connections), state="idle")
+
+    registry.add_collector(collect)
 
 
 class RedisCacheRepository(Cache):
     def __init__(
             self,
             prefix: str = "",
+            client: Redis | None = None,
             **redis_kwargs,
     ) -> None:
+        """
+        Args:
+            prefix: Prefix of every key
+            client: Shared client to use, e.g. the container's process-wide one. When
+                omitted, a client is built from redis_kwargs on first use
+        """
         self.prefix = prefix + ":" if prefix else ""
         self._redis_kwargs = redis_kwargs
         self._redis_kwargs["decode_responses"] = True
-        self._redis_client: Redis | None = None
+        # One pooled client for the lifetime of the repository; it is safe for concurrent use
+        self._redis_client: Redis | None = client
 
     async def build_client(self) -> Redis:
         return Redis(**self._redis_kwargs)
 
     async def __aenter__(self) -> Self:
-        self._redis_client = await self.build_client()
-        await self._redis_client.__aenter__()
         return self
 
     @property
     def _client(self) -> Redis:
         if self._redis_client is None:
-            raise ClientNotInitializedError(self.__class__.__name__)
+            self._redis_client = Redis(**self._redis_kwargs)
         return self._redis_client
 
     async def __aexit__(
@@ -40,8 +62,8 @@ class RedisCacheRepository(Cache):
             exc_val: BaseException | None,
             exc_tb: TracebackType | None,
     ) -> None:
-        if self._redis_client:
-            await self._redis_client.close()
+        # Connections go back to the pool after every command, there is nothing to release per block
+        pass
 
     async def set(self, key: str, value: str, ttl: int | None = None) -> None:
         async with self as repo:
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from datetime import datetime, UTC
+
+from src.repositories.redis_repository import RedisCacheRepository
+from src.usecases.interfaces.task_status_interface import TaskStatusInterface
+from src.usecases.schemas.task_schemas import TaskStatus, TaskStatusSchema
+
+_log = logging.getLogger(__name__)
+
+# Store and announce a status; with ARGV[3] == '0' only an already registered task is updated
+_SET_STATUS_SCRIPT = """
+local stored
+if ARGV[3] == '1' then
+    stored = redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+else
+    stored = redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2], 'XX')
+end
+if stored then
+    redis.call('PUBLISH', KEYS[1], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+class RedisTaskStatusRepository(TaskStatusInterface, RedisCacheRepository):
+    """
+    Task statuses stored as JSON under task:<id> and announced on a pub/sub
+    channel with the same name.
+
+    Every waiter in the process shares one pattern subscription and updates are
+    fanned out locally, so any number of long-polling or SSE clients costs a
+    single Redis connection.
+    """
+    KEY_PREFIX = "task"
+
+    def __init__(self, ttl: int, prefix: str = "", **redis_kwargs) -> None:
+        super().__init__(prefix=prefix, **redis_kwargs)
+        self._ttl = ttl
+        self._waiters: dict[str, set[asyncio.Queue[TaskStatusSchema]]] = defaultdict(set)
+        self._listener: asyncio.Task | None = None
+        self._subscribed = asyncio.Event()
+
+    def _key(self, task_id: str) -> str:
+        return f"{self.KEY_PREFIX}:{task_id}"
+
+    async def set_status(
+            self,
+            task_id: str,
+            status: TaskStatus,
+            error: str | None = None,
+            create: bool = True,
+    ) -> TaskStatusSchema | None:
+        task_status = TaskStatusSchema(task_id=task_id, status=status, updated_at=datetime.now(UTC), error=error)
+        value = task_status.model_dump_json()
+        key = self.prefix + self._key(task_id)
+        stored = await self._client.eval(_SET_STATUS_SCRIPT, 1, key, value, self._ttl, int(create))
+        return task_status if stored else None
+
+    async def set_statuses(
+            self,
+            task_ids: list[str],
+            status: TaskStatus,
+            error: str | None = None,
+            create: bool = True,
+    ) -> None:
+        updated_at = datetime.now(UTC)
+        async with self._client.pipeline(transaction=False) as pipe:
+            for task_id in task_ids:
+                value = TaskStatusSchema(
+                    task_id=task_id, status=status, updated_at=updated_at, error=error
+                ).model_dump_json()
+                pipe.eval(_SET_STATUS_SCRIPT, 1, self.prefix + self._key(task_id), value, self._ttl, int(create))
+            await pipe.execute()
+
+    async def get_status(self, task_id: str) -> TaskStatusSchema | None:
+        value = await self._client.get(self.prefix + self._key(task_id))
+        return TaskStatusSchema.model_validate_json(value) if value else None
+
+    async def watch_status(
+            self,
+            task_id: str,
+            heartbeat: float | None = None,
+    ) -> AsyncIterator[TaskStatusSchema | None]:
+        """
+        Yield the current status of the task and then every update published for it.
+
+        After a resubscribe the stored status is yielded again, as updates published
+        while the subscription was down are lost. With heartbeat set, None is yielded
+        whenever that many seconds pass without an update.
+        """
+        queue: asyncio.Queue[TaskStatusSchema] = asyncio.Queue()
+        self._waiters[task_id].add(queue)
+        try:
+            await self._ensure_listener()
+            # Read the stored status only once subscribed, so no update can slip in between
+            if current := await self.get_status(task_id):
+                yield current
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), heartbeat)
+                except TimeoutError:
+                    yield None
+        finally:
+            waiters = self._waiters.get(task_id)
+            if waiters is not None:
+                waiters.discard(queue)
+                if not waiters:
+                    del self._waiters[task_id]
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+            self._subscribed.clear()
+
+    async def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        await self._subscribed.wait()
+
+    async def _listen(self) -> None:
+        channel_prefix = f"{self.prefix}{self.KEY_PREFIX}:"
+        resubscribing = False
+        while True:
+            # Holds one connection of the shared pool for as long as it is subscribed
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.psubscribe(channel_prefix + "*")
+                self._subscribed.set()
+                _log.info("Subscribed to task status updates on %s*", channel_prefix)
+                if resubscribing:
+                    await self._resend_stored_statuses()
+                    resubscribing = False
+
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    waiters = self._waiters.get(message["channel"][len(channel_prefix):])
+                    if not waiters:
+                        continue
+                    task_status = TaskStatusSchema.model_validate_json(message["data"])
+                    for queue in waiters:
+                        queue.put_nowait(task_status)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _log.error("Task status subscription failed: %s, resubscribing...", e)
+                self._subscribed.clear()
+                resubscribing = True
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    async def _resend_stored_statuses(self) -> None:
+        """Hand every waiter the stored status of its task, covering updates missed while unsubscribed."""
+        task_ids = list(self._waiters)
+        if not task_ids:
+            return
+        values = await self._client.mget([self.prefix + self._key(task_id) for task_id in task_ids])
+        for task_id, value in zip(task_ids, values):
+            waiters = self._waiters.get(task_id)
+            if value and waiters:
+                task_status = TaskStatusSchema.model_validate_json(value)
+                for queue in waiters:
+                    queue.put_nowait(task_status)
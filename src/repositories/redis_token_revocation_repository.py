@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+
+from src.repositories.redis_repository import RedisCacheRepository
+from src.usecases.interfaces.token_revocation_interface import TokenRevocationInterface
+from src.utils.bloom_filter import BloomFilter
+from src.utils.metrics import registry
+
+_log = logging.getLogger(__name__)
+
+_checks = registry.counter(
+    "auth_token_revocation_checks_total", "Access token revocation checks by how they were answered.", ("result",)
+)
+
+
+class RedisTokenRevocationRepository(TokenRevocationInterface, RedisCacheRepository):
+    """
+    Revoked access token ids in a sorted set scored by token expiry, mirrored in a
+    local Bloom filter.
+
+    Almost no token is ever revoked, and the filter says so without any I/O; only a
+    filter hit, i.e. a revoked token or a rare false positive, is confirmed in Redis.
+    Every revocation bumps a version counter. A background task reads the counter
+    every sync interval and rebuilds the filter when it has changed, so the other
+    processes see a revocation within one interval. Until the first sync has
+    succeeded every check goes to Redis.
+    """
+    KEY_PREFIX = "revoked_tokens"
+
+    def __init__(
+            self,
+            sync_interval: float,
+            capacity: int,
+            error_rate: float,
+            prefix: str = "",
+            **redis_kwargs,
+    ) -> None:
+        super().__init__(prefix=prefix, **redis_kwargs)
+        self._sync_interval = sync_interval
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        self._version: str | None = None
+        self._synced = False
+        self._sync_task: asyncio.Task | None = None
+
+    @property
+    def _set_key(self) -> str:
+        return f"{self.prefix}{self.KEY_PREFIX}"
+
+    @property
+    def _version_key(self) -> str:
+        return f"{self.prefix}{self.KEY_PREFIX}:version"
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.zadd(self._set_key, {jti: expires_at})
+            pipe.incr(self._version_key)
+            await pipe.execute()
+        self._filter.add(jti)
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self._synced and jti not in self._filter:
+            _checks.inc(result="filter")
+            return False
+        revoked = await self._client.zscore(self._set_key, jti) is not None
+        _checks.inc(result="revoked" if revoked else "redis")
+        return revoked
+
+    async def sync(self) -> None:
+        """Rebuild the filter from Redis if anything was revoked since the last sync."""
+        version = await self._client.get(self._version_key)
+        if self._synced and version == self._version:
+            return
+
+        async with self._client.pipeline(transaction=True) as pipe:
+            # Expired tokens are rejected by their exp claim, they need no entry
+            pipe.zremrangebyscore(self._set_key, "-inf", time.time())
+            pipe.zrange(self._set_key, 0, -1)
+            _, revoked = await pipe.execute()
+
+        self._filter = BloomFilter.from_items(revoked, max(self._capacity, 2 * len(revoked)), self._error_rate)
+        self._version = version
+        self._synced = True
+        _log.debug("Revoked token filter rebuilt with %s token(s).", len(revoked))
+
+    def start(self) -> None:
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def close(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            await asyncio.gather(self._sync_task, return_exceptions=True)
+            self._sync_task = None
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                _log.warning("Failed to sync revoked access tokens: %s", e)
+            await asyncio.sleep(self._sync_interval)
@@ -0,0 +1,56 @@
+import logging
+from importlib.util import find_spec
+
+import uvicorn
+
+from src.config import LoggingConfig, ServerConfig
+from src.utils.log_setup import setup_logging
+
+_log = logging.getLogger(__name__)
+
+setup_logging()
+
+
+def _available(choice: str, module: str, fallback: str) -> str:
+    """Return choice unless it names an implementation whose module is not installed."""
+    if choice == module and find_spec(module) is None:
+        _log.warning("%s is not installed, falling back to %s. Install the 'server' extra to use it.", module, fallback)
+        return fallback
+    return choice
+
+
+def main() -> None:
+    """
+    Production entry point: several worker processes without the reload file watcher.
+    Use start-dev.sh for development with auto-reload.
+    """
+    config = ServerConfig()
+    workers = config.worker_count
+    _log.info("Starting %s worker process(es) on %s:%s", workers, config.HOST, config.PORT)
+
+    uvicorn.run(
+        "src.main:app",
+        host=config.HOST,
+        port=config.PORT,
+        workers=workers,
+        loop=_available(config.LOOP, "uvloop", "asyncio"),
+        http=_available(config.HTTP, "httptools", "h11"),
+        backlog=config.BACKLOG,
+        timeout_keep_alive=config.KEEP_ALIVE_TIMEOUT,
+        # Requests above this many open connections and tasks get 503 instead of queueing up
+        limit_concurrency=config.LIMIT_CONCURRENCY,
+        # A worker exits after this many requests and the supervisor starts a fresh one,
+        # which bounds the effect of slow memory growth
+        limit_max_requests=config.MAX_REQUESTS,
+        timeout_graceful_shutdown=config.GRACEFUL_SHUTDOWN_TIMEOUT,
+        proxy_headers=True,
+        forwarded_allow_ips=config.FORWARDED_ALLOW_IPS,
+        access_log=config.ACCESS_LOG,
+        log_level=LoggingConfig().LOG_LEVEL.lower(),
+        # Leave uvicorn's loggers unconfigured so they propagate to the shared queue handler
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import logging
+import math
 from datetime import datetime, UTC
 from jose.exceptions import ExpiredSignatureError, JWTError
 
@@ -6,8 +7,12 @@ from src.config import SecurityConfig
 from src.api.schemas.auth_schemas import TokenSchema
 from src.usecases.interfaces.db_interfaces.db_user_interface import DBUserInterface
 from src.usecases.interfaces.db_interfaces.db_refresh_token_interface import DBRefreshTokenInterface
-from src.usecases.errors import AuthenticationError, NotFoundDatabaseError, UserAlreadyExistsError
+from src.usecases.interfaces.rate_limit_interface import RateLimitInterface
+from src.usecases.interfaces.token_revocation_interface import TokenRevocationInterface
+from src.usecases.errors import AuthenticationError, LoginRateLimitError, NotFoundDatabaseError, \
+    RevocationCheckUnavailableError, UserAlreadyExistsError
 from src.usecases.schemas.auth_schemas import TokenData
+from src.usecases.schemas.rate_limit_schemas import TokenBucket
 from src.utils.security import verify_token_and_get_data, create_access_token, create_refresh_token, verify_password, \
     get_password_hash
 from src.usecases.schemas.user_schemas import UserSchema, UserCreateSchema, UserRole
@@ -17,19 +22,28 @@ _log = logging.getLogger(__name__)
 
 class AuthUseCase:
 
-    def __init__(self, user_repo: DBUserInterface, refresh_token_repo: DBRefreshTokenInterface):
+    def __init__(
+            self,
+            user_repo: DBUserInterface,
+            refresh_token_repo: DBRefreshTokenInterface,
+            rate_limiter: RateLimitInterface,
+            token_revocation: TokenRevocationInterface,
+    ):
         self.user_repo = user_repo
         self.refresh_token_repo = refresh_token_repo
-        _log.info("AuthUseCase initialized with user and refresh token repositories.")
+        self.rate_limiter = rate_limiter
+        self.token_revocation = token_revocation
+        self._security_config = SecurityConfig()
+        _log.debug("AuthUseCase initialized with user and refresh token repositories.")
 
     async def register_new_user(self, username: str, password: str, role: UserRole) -> UserSchema:
-        _log.info(f"Attempting to register new user: '{username}' with role: {role.value}.")
+        _log.info("Attempting to register new user: '%s' with role: %s.", username, role.value)
         try:
             await self.user_repo.get_user_by_username(username)
-            _log.warning(f"Registration failed: User '{username}' already exists.")
+            _log.warning("Registration failed: User '%s' already exists.", username)
             raise UserAlreadyExistsError(f"User with username '{username}' already exists.")
         except NotFoundDatabaseError:
-            _log.debug(f"Username '{username}' is available. Proceeding with registration.")
+            _log.debug("Username '%s' is available. Proceeding with registration.", username)
             pass
 
         hashed_password = get_password_hash(password)
@@ -38,26 +52,39 @@ class AuthUseCase:
         user_data = UserCreateSchema(username=username, password=hashed_password, role=role)
         new_user = await self.user_repo.create_user(user_data)
 
-        _log.info(f"User '{username}' registered successfully with ID: {new_user.id}.")
+        _log.info("User '%s' registered successfully with ID: %s.", username, new_user.id)
         return new_user
 
-    async def login_for_access_and_refresh_token(self, username: str, password: str) -> TokenSchema:
-        _log.info(f"Attempting login for user: '{username}'.")
+    async def login_for_access_and_refresh_token(
+            self,
+            username: str,
+            password: str,
+            client_ip: str | None = None,
+    ) -> TokenSchema:
+        """
+        Raises:
+            LoginRateLimitError: If the username or the client IP has run out of login attempts
+            AuthenticationError: If the username or the password is wrong
+        """
+        _log.debug("Attempting login for user: '%s'.", username)
+        # Before the user lookup and the bcrypt check, so rejected attempts cost neither
+        await self._check_login_rate(username, client_ip)
+
         try:
             user = await self.user_repo.get_user_by_username(username)
-            _log.debug(f"User '{username}' found in the database (ID: {user.id}).")
+            _log.debug("User '%s' found in the database (ID: %s).", username, user.id)
         except NotFoundDatabaseError:
-            _log.warning(f"Login failed: Username '{username}' not found.")
+            _log.warning("Login failed: Username '%s' not found.", username)
             raise AuthenticationError("Incorrect username")
         except Exception as e:
-            _log.error(f"Error fetching user '{username}' during login: {e}")
+            _log.error("Error fetching user '%s' during login: %s", username, e)
             raise AuthenticationError("Incorrect username")
 
         if not verify_password(password, user.hashed_password):
-            _log.warning(f"Login failed for user '{username}': Incorrect password.")
+            _log.warning("Login failed for user '%s': Incorrect password.", username)
             raise AuthenticationError("Incorrect password")
 
-        _log.info(f"User '{username}' authenticated successfully. Creating tokens.")
+        _log.info("User '%s' authenticated successfully. Creating tokens.", username)
 
         access_token = create_access_token(data={"sub": user.username, "role": user.role.value, "user_id": user.id})
         _log.debug("Access token created.")
@@ -71,7 +98,7 @@ class AuthUseCase:
             token=refresh_token_str,
             expires_at=expires_at
         )
-        _log.info(f"New refresh token saved/updated for user ID {user.id}. Expires at: {expires_at.isoformat()}.")
+        _log.info("New refresh token saved/updated for user ID %s. Expires at: %s.", user.id, expires_at.isoformat())
 
         return TokenSchema(
             access_token=access_token,
@@ -80,11 +107,11 @@ class AuthUseCase:
         )
 
     async def refresh_access_token(self, refresh_token: str) -> TokenSchema:
-        _log.info("Attempting to refresh access token.")
+        _log.debug("Attempting to refresh access token.")
 
         try:
             token_data: TokenData = verify_token_and_get_data(refresh_token)
-            _log.debug(f"Refresh token validated. User: '{token_data.username}', ID: {token_data.user_id}.")
+            _log.debug("Refresh token validated. User: '%s', ID: %s.", token_data.username, token_data.id)
         except ExpiredSignatureError:
             _log.warning("Refresh token failed validation: Expired signature.")
             raise AuthenticationError("Refresh token has expired.")
@@ -93,28 +120,91 @@ class AuthUseCase:
             raise AuthenticationError("Invalid refresh token.")
 
         try:
-            user = await self.user_repo.get_user_by_id(token_data.user_id)
+            # The user and their stored token from the cache, or from a single joined query
+            user = await self.user_repo.get_user_with_refresh_token(token_data.id)
         except NotFoundDatabaseError:
-            _log.warning(f"Refresh failed: User with ID {token_data.user_id} (from token) not found in DB.")
+            _log.warning("Refresh failed: User with ID %s (from token) not found in DB.", token_data.id)
             raise AuthenticationError("User not found.")
 
-        db_token = await self.refresh_token_repo.get_token_by_user_id(user.id)
+        db_token = user.refresh_token
 
         if not db_token:
-            _log.warning(f"Refresh failed for user ID {user.id}: No corresponding token found in DB.")
+            _log.warning("Refresh failed for user ID %s: No corresponding token found in DB.", user.id)
             raise AuthenticationError("Invalid refresh token.")
 
         if db_token.token != refresh_token:
-            _log.warning(f"Refresh failed for user ID {user.id}: Token mismatch (potential token reuse/theft).")
+            _log.warning("Refresh failed for user ID %s: Token mismatch (potential token reuse/theft).", user.id)
             raise AuthenticationError("Invalid refresh token.")
 
-        _log.info(f"Refresh token successfully validated against database for user ID: {user.id}.")
+        _log.info("Refresh token successfully validated against database for user ID: %s.", user.id)
 
         new_access_token = create_access_token(data={"sub": user.username, "role": user.role.value, "user_id": user.id})
-        _log.info(f"New access token created for user ID {user.id}.")
+        _log.info("New access token created for user ID %s.", user.id)
 
         return TokenSchema(
             access_token=new_access_token,
             refresh_token=refresh_token,
             token_type="bearer"
-        )
\ No newline at end of file
+        )
+
+    async def ensure_not_revoked(self, token_data: TokenData) -> None:
+        """
+        Raises:
+            AuthenticationError: If the token has no jti, e.g. a refresh token, or was revoked by a logout
+            RevocationCheckUnavailableError: If Redis is needed for the check and cannot be reached
+        """
+        # Only access tokens carry a jti, and a token without one could never be revoked
+        if not token_data.jti:
+            _log.warning("Rejected token without jti of user ID %s.", token_data.id)
+            raise AuthenticationError("Token has no jti.")
+
+        try:
+            revoked = await self.token_revocation.is_revoked(token_data.jti)
+        except Exception as e:
+            # Fails closed, so a logout holds during an outage. Only filter hits and checks
+            # before the first sync reach Redis, other requests are not affected
+            _log.error("Token revocation check failed for user ID %s: %s", token_data.id, e)
+            raise RevocationCheckUnavailableError() from e
+
+        if revoked:
+            _log.warning("Rejected revoked access token of user ID %s.", token_data.id)
+            raise AuthenticationError("Token has been revoked.")
+
+    async def logout(self, token_data: TokenData) -> None:
+        """Revoke the access token and delete the user's refresh token, so neither can be used again."""
+        if token_data.jti and token_data.exp:
+            await self.token_revocation.revoke(token_data.jti, token_data.exp)
+        await self.refresh_token_repo.delete_token_by_user_id(token_data.id)
+        _log.info("User ID %s logged out.", token_data.id)
+
+    async def _check_login_rate(self, username: str, client_ip: str | None) -> None:
+        config = self._security_config
+        if not config.LOGIN_RATE_LIMIT_ENABLED:
+            return
+
+        buckets = [
+            TokenBucket(
+                key=f"login:user:{username}",
+                capacity=config.LOGIN_USERNAME_BURST,
+                refill_per_second=config.LOGIN_USERNAME_PER_MINUTE / 60,
+            )
+        ]
+        if client_ip:
+            buckets.append(
+                TokenBucket(
+                    key=f"login:ip:{client_ip}",
+                    capacity=config.LOGIN_IP_BURST,
+                    refill_per_second=config.LOGIN_IP_PER_MINUTE / 60,
+                )
+            )
+
+        try:
+            retry_after = await self.rate_limiter.acquire(buckets)
+        except Exception as e:
+            # Without Redis logins are not limited rather than not possible
+            _log.warning("Login rate limit check failed, allowing the attempt: %s", e)
+            return
+
+        if retry_after > 0:
+            _log.warning("Login rate limit exceeded for user '%s' from %s.", username, client_ip)
+            raise LoginRateLimitError(retry_after=math.ceil(retry_after))
@@ -1,13 +1,185 @@
 import asyncio
 import logging
+from datetime import datetime, UTC
+from typing import Any
+
+from src.config import RabbitMQConfig, WorkerConfig
+from src.usecases.errors import MessageInProgressError, NonRetriableMessageError
+from src.usecases.interfaces.idempotency_interface import IdempotencyInterface
+from src.usecases.interfaces.task_status_interface import TaskStatusInterface
+from src.usecases.message_handler_registry import MessageHandlerRegistry, MessageRoute
+from src.usecases.retry_policy import will_retry
+from src.usecases.schemas.message_schemas import (
+    ClaimResult,
+    DomainEventPayload,
+    InboundMessage,
+    MessageType,
+    TestTaskPayload,
+)
+from src.usecases.schemas.outbox_schemas import DomainEventType
+from src.usecases.schemas.task_schemas import TaskStatus
 
 _log = logging.getLogger(__name__)
 
 
 class ConsumerUseCase:
 
+    def __init__(self, task_status_repo: TaskStatusInterface, idempotency_repo: IdempotencyInterface):
+        self.task_status_repo = task_status_repo
+        self.idempotency_repo = idempotency_repo
+        rabbitmq_config = RabbitMQConfig()
+        self._max_attempts = rabbitmq_config.RETRY_MAX_ATTEMPTS
+        self._retry_delays = rabbitmq_config.retry_delays
+
+        self.registry = MessageHandlerRegistry(
+            default_type=MessageType.TEST_TASK.value,
+            concurrency_overrides=WorkerConfig().HANDLER_CONCURRENCY,
+        )
+        self.registry.register(
+            MessageType.TEST_TASK.value,
+            TestTaskPayload,
+            self._handle_test_task,
+            batch_handler=self._handle_test_task_batch,
+        )
+        for event_type in DomainEventType:
+            self.registry.register(event_type.value, DomainEventPayload, self._handle_domain_event, concurrency=4)
+
+    async def process_inbound_message(self, message: InboundMessage):
+        claim = await self._claim(message)
+        if claim is ClaimResult.DUPLICATE:
+            return
+        if claim is ClaimResult.IN_PROGRESS:
+            raise MessageInProgressError(f"Message {message.message_id} is being processed by another consumer.")
+
+        await self._set_status(message, TaskStatus.RUNNING)
+        try:
+            await self.registry.dispatch(message)
+        except Exception as e:
+            await self._release(message)
+            await self._set_failed(message, e)
+            raise
+        await self._complete(message)
+        await self._set_status(message, TaskStatus.DONE)
+
+    async def process_inbound_batch(self, batch: list[InboundMessage]) -> dict[int, Exception]:
+        """
+        Process a batch grouped by message type. Types with a batch handler get all
+        of their messages in one call, other messages are handled one by one, and
+        every group runs concurrently within its type's concurrency limit.
+
+        Returns:
+            dict: Errors of the failed messages, keyed by their position in the batch
+        """
+        failures: dict[int, Exception] = {}
+        claims = await asyncio.gather(*(self._claim(message) for message in batch))
+
+        groups: dict[str, tuple[MessageRoute, list[tuple[int, Any]]]] = {}
+        for position, (message, claim) in enumerate(zip(batch, claims)):
+            if claim is ClaimResult.IN_PROGRESS:
+                failures[position] = MessageInProgressError(
+                    f"Message {message.message_id} is being processed by another consumer."
+                )
+                continue
+            if claim is ClaimResult.DUPLICATE:
+                continue
+            try:
+                route = self.registry.route(message)
+                payload = route.validate(message)
+            except NonRetriableMessageError as e:
+                await self._release(message)
+                await self._set_failed(message, e)
+                failures[position] = e
+                continue
+            group_key = route.message_type if route.batch_handler else f"{route.message_type}#{position}"
+            groups.setdefault(group_key, (route, []))[1].append((position, payload))
+
+        results = await asyncio.gather(
+            *(self._process_group(route, [(batch[position], payload) for position, payload in entries])
+              for route, entries in groups.values()),
+            return_exceptions=True,
+        )
+        for (_, entries), result in zip(groups.values(), results):
+            if isinstance(result, Exception):
+                failures.update({position: result for position, _ in entries})
+        return failures
+
     @staticmethod
-    async def process_inbound_message(data: dict):
-        _log.info(f"WORKER: ✅ Message consumed. Processing data: {data}")
+    async def handle_rpc_call(method: str, payload: dict) -> dict:
+        _log.info("WORKER: RPC call '%s' received.", method)
+        if method != "test.echo":
+            raise ValueError(f"Unknown RPC method '{method}'.")
+        return {"echo": payload, "processed_at": datetime.now(UTC).isoformat()}
+
+    @staticmethod
+    async def _handle_test_task(payload: TestTaskPayload):
+        _log.debug("WORKER: Message consumed, processing.")
         await asyncio.sleep(1)
-        _log.info(f"WORKER: Finished processing data: {data['content']}")
\ No newline at end of file
+        _log.debug("WORKER: Finished processing message.")
+
+    @staticmethod
+    async def _handle_test_task_batch(payloads: list[TestTaskPayload]):
+        _log.debug("WORKER: Batch of %s messages consumed. Processing in one pass.", len(payloads))
+        await asyncio.sleep(1)
+        _log.debug("WORKER: Finished processing batch of %s messages.", len(payloads))
+
+    @staticmethod
+    async def _handle_domain_event(event: DomainEventPayload):
+        _log.info("WORKER: Domain event '%s' #%s received.", event.event_type, event.event_id)
+
+    async def _process_group(self, route: MessageRoute, entries: list[tuple[InboundMessage, Any]]) -> None:
+        messages = [message for message, _ in entries]
+        await asyncio.gather(*(self._set_status(message, TaskStatus.RUNNING) for message in messages))
+        try:
+            await self.registry.dispatch_payloads(route, [payload for _, payload in entries])
+        except Exception as e:
+            await asyncio.gather(*(self._release(message) for message in messages))
+            await asyncio.gather(*(self._set_failed(message, e) for message in messages))
+            raise
+        await asyncio.gather(*(self._complete(message) for message in messages))
+        await asyncio.gather(*(self._set_status(message, TaskStatus.DONE) for message in messages))
+
+    async def _claim(self, message: InboundMessage) -> ClaimResult:
+        if message.message_id is None:
+            return ClaimResult.CLAIMED
+        try:
+            claim = await self.idempotency_repo.claim(message.message_id)
+        except Exception as e:
+            # Without Redis fall back to plain at-least-once processing
+            _log.warning("Failed to check message %s for duplicates: %s", message.message_id, e)
+            return ClaimResult.CLAIMED
+
+        if claim is ClaimResult.DUPLICATE:
+            dropped = self.idempotency_repo.get_stats()["duplicates_dropped"]
+            _log.info("WORKER: Dropped duplicate message %s (%s duplicates dropped so far).", message.message_id, dropped)
+        return claim
+
+    async def _complete(self, message: InboundMessage) -> None:
+        if message.message_id is None:
+            return
+        try:
+            await self.idempotency_repo.complete(message.message_id)
+        except Exception as e:
+            _log.warning("Failed to mark message %s as processed: %s", message.message_id, e)
+
+    async def _release(self, message: InboundMessage) -> None:
+        if message.message_id is None:
+            return
+        try:
+            await self.idempotency_repo.release(message.message_id)
+        except Exception as e:
+            _log.warning("Failed to release message %s: %s", message.message_id, e)
+
+    async def _set_failed(self, message: InboundMessage, error: Exception) -> None:
+        # Same decision the repository makes when it routes the failed message
+        retrying = will_retry(error, message.attempt, self._max_attempts, self._retry_delays)
+        status = TaskStatus.QUEUED if retrying else TaskStatus.FAILED
+        await self._set_status(message, status, error=f"{type(error).__name__}: {error}")
+
+    async def _set_status(self, message: InboundMessage, status: TaskStatus, error: str | None = None) -> None:
+        # Only tasks registered by the API are tracked; status tracking never fails the task itself
+        if message.message_id is None:
+            return
+        try:
+            await self.task_status_repo.set_status(message.message_id, status, error=error, create=False)
+        except Exception as e:
+            _log.warning("Failed to set status '%s' for task %s: %s", status.value, message.message_id, e)
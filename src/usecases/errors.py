@@ -6,10 +6,61 @@ class AuthenticationError(Exception):
     def __init__(self, message: str = "Invalid username or password."):
         super().__init__(message)
 
+class LoginRateLimitError(Exception):
+    def __init__(self, message: str = "Too many login attempts, try again later.", retry_after: int = 60):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class RevocationCheckUnavailableError(Exception):
+    def __init__(self, message: str = "Token revocation cannot be checked right now.", retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 class UserAlreadyExistsError(Exception):
     def __init__(self, message: str = "User already exists."):
         super().__init__(message)
 
 class ClientNotInitializedError(Exception):
     def __init__(self, client_name: str = "Client"):
-        super().__init__(f"{client_name} has not been initialized.")
\ No newline at end of file
+        super().__init__(f"{client_name} has not been initialized.")
+
+class NonRetriableMessageError(Exception):
+    def __init__(self, message: str = "Message cannot be processed and will not be retried."):
+        super().__init__(message)
+
+class MessageDecodeError(NonRetriableMessageError):
+    def __init__(self, message: str = "Failed to decode message body."):
+        super().__init__(message)
+
+class UnknownMessageTypeError(NonRetriableMessageError):
+    def __init__(self, message: str = "No handler registered for the message type."):
+        super().__init__(message)
+
+class MessageValidationError(NonRetriableMessageError):
+    def __init__(self, message: str = "Message body does not match the schema of its type."):
+        super().__init__(message)
+
+class BrokerBackpressureError(Exception):
+    def __init__(self, message: str = "Message broker is unavailable and the outbound spool is full.", retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class UnknownLaneError(Exception):
+    def __init__(self, message: str = "Unknown priority lane."):
+        super().__init__(message)
+
+class RPCTimeoutError(Exception):
+    def __init__(self, message: str = "RPC call timed out."):
+        super().__init__(message)
+
+class RPCError(Exception):
+    def __init__(self, message: str = "RPC call failed on the remote side."):
+        super().__init__(message)
+
+class TaskNotFoundError(Exception):
+    def __init__(self, message: str = "Task not found."):
+        super().__init__(message)
+
+class MessageInProgressError(Exception):
+    def __init__(self, message: str = "Message is being processed by another consumer."):
+        super().__init__(message)
\ No newline at end of file
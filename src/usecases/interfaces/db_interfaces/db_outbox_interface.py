@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+
+from src.usecases.schemas.outbox_schemas import OutboxEventSchema
+
+
+class DBOutboxInterface(ABC):
+
+    @abstractmethod
+    async def publish_pending_events(
+            self,
+            publish: Callable[[list[OutboxEventSchema]], Awaitable[None]],
+            batch_size: int,
+    ) -> int:
+        pass
@@ -12,4 +12,8 @@ class DBRefreshTokenInterface(ABC):
 
     @abstractmethod
     async def get_token_by_user_id(self, user_id: int) -> Union[RefreshTokenSchema, None]:
+        pass
+
+    @abstractmethod
+    async def delete_token_by_user_id(self, user_id: int) -> None:
         pass
\ No newline at end of file
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 
-from src.usecases.schemas.user_schemas import UserCreateSchema, UserSchema
+from src.usecases.schemas.user_schemas import UserCreateSchema, UserSchema, UserWithTokenSchema
 
 
 class DBUserInterface(ABC):
@@ -17,6 +17,11 @@ class DBUserInterface(ABC):
     async def get_user_by_username(self, username: str) -> UserSchema:
         pass
 
+    @abstractmethod
+    async def get_user_with_refresh_token(self, user_id: int) -> UserWithTokenSchema:
+        """The user together with their refresh token, if any, from the cache or one joined query."""
+        pass
+
     @abstractmethod
     async def update_user_password(self, user_id: int, new_password_hash: str) -> UserSchema:
         pass
\ No newline at end of file
@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+
+from src.usecases.schemas.message_schemas import ClaimResult
+
+
+class IdempotencyInterface(ABC):
+    @abstractmethod
+    async def claim(self, message_id: str) -> ClaimResult:
+        pass
+
+    @abstractmethod
+    async def complete(self, message_id: str) -> None:
+        pass
+
+    @abstractmethod
+    async def release(self, message_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def get_stats(self) -> dict[str, int]:
+        pass
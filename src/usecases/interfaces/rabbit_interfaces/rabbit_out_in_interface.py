@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+from src.utils.concurrency_limiter import AdaptiveConcurrencyLimiter
 
 
 class OutInRabbitMQRepositoryInterface(ABC):
@@ -8,8 +11,42 @@ class OutInRabbitMQRepositoryInterface(ABC):
        pass
 
     @abstractmethod
-    async def push_task(self, payload: str) -> None:
+    async def push_task(
+            self,
+            payload: dict,
+            message_type: str | None = None,
+            message_id: str | None = None,
+            spool: bool = True,
+            lane: str | None = None,
+            partition_key: str | None = None,
+    ) -> None:
+        pass
+
+    async def consume_tasks(
+            self,
+            on_message_callback=None,
+            concurrency: int = 1,
+            limiter: AdaptiveConcurrencyLimiter | None = None,
+    ) -> None:
+        pass
+
+    async def consume_partitions(self, on_message_callback=None, shards: Sequence[int] = ()) -> None:
+        pass
+
+    async def consume_batches(self, on_batch_callback=None, batch_size: int = 100, batch_timeout: float = 0.5) -> None:
+        pass
+
+    async def monitor_queues(self, interval: float = 15.0) -> None:
+        pass
+
+    async def replay_dead_letters(self, limit: int | None = None) -> int:
+        pass
+
+    async def stop_consuming(self) -> None:
+        pass
+
+    async def drain(self, timeout: float) -> bool:
         pass
 
-    async def consume_tasks(self, on_message_callback=None) -> None:
+    async def close(self) -> None:
         pass
\ No newline at end of file
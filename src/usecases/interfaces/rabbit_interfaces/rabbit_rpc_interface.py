@@ -0,0 +1,20 @@
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class RPCRabbitMQRepositoryInterface(ABC):
+
+    @abstractmethod
+    async def connect_and_declare(self) -> None:
+        pass
+
+    @abstractmethod
+    async def call(self, method: str, payload: Any, timeout: float | None = None) -> Any:
+        pass
+
+    async def serve(self, handler: Callable[[str, Any], Awaitable[Any]]) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+from src.usecases.schemas.rate_limit_schemas import TokenBucket
+
+
+class RateLimitInterface(ABC):
+    @abstractmethod
+    async def acquire(self, buckets: Sequence[TokenBucket]) -> float:
+        """
+        Take one token from every bucket, or from none of them if any bucket is empty.
+
+        Returns:
+            0 when the tokens were taken, otherwise the seconds until the emptiest bucket has a token again
+        """
+        pass
@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+
+from src.usecases.schemas.task_schemas import TaskStatus, TaskStatusSchema
+
+
+class TaskStatusInterface(ABC):
+    @abstractmethod
+    async def set_status(
+            self,
+            task_id: str,
+            status: TaskStatus,
+            error: str | None = None,
+            create: bool = True,
+    ) -> TaskStatusSchema | None:
+        """Store a task status; with create=False only a task that is already tracked is updated."""
+        pass
+
+    @abstractmethod
+    async def set_statuses(
+            self,
+            task_ids: list[str],
+            status: TaskStatus,
+            error: str | None = None,
+            create: bool = True,
+    ) -> None:
+        """Store the same status for several tasks in one round trip, see set_status."""
+        pass
+
+    @abstractmethod
+    async def get_status(self, task_id: str) -> TaskStatusSchema | None:
+        pass
+
+    @abstractmethod
+    def watch_status(
+            self,
+            task_id: str,
+            heartbeat: float | None = None,
+    ) -> AsyncIterator[TaskStatusSchema | None]:
+        """Yield the current status and every update, or None after heartbeat seconds without one."""
+        pass
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+
+
+class TokenRevocationInterface(ABC):
+    @abstractmethod
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoke the token with this jti until its expiry (a Unix timestamp), after which it is invalid anyway."""
+        pass
+
+    @abstractmethod
+    async def is_revoked(self, jti: str) -> bool:
+        pass
+
+    def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from src.usecases.errors import MessageValidationError, UnknownMessageTypeError
+from src.usecases.schemas.message_schemas import InboundMessage
+from src.utils.concurrency_limiter import current_slot
+
+_log = logging.getLogger(__name__)
+
+
+class MessageRoute:
+    def __init__(
+            self,
+            message_type: str,
+            model: type[BaseModel],
+            handler: Callable[[Any], Awaitable[None]],
+            batch_handler: Callable[[list[Any]], Awaitable[None]] | None,
+            concurrency: int,
+    ) -> None:
+        self.message_type = message_type
+        self.handler = handler
+        self.batch_handler = batch_handler
+        self.concurrency = concurrency
+        # Built once per type instead of once per message
+        self.adapter = TypeAdapter(model)
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    def validate(self, message: InboundMessage) -> Any:
+        try:
+            return self.adapter.validate_python(message.body)
+        except ValidationError as e:
+            raise MessageValidationError(
+                f"Invalid '{self.message_type}' message {message.message_id}: {e.error_count()} validation error(s)."
+            ) from e
+
+
+class MessageHandlerRegistry:
+    """
+    Routes inbound messages to handlers by their AMQP type property.
+
+    Every type has its own pydantic model and its own concurrency limit, so a slow
+    message type can only occupy its share of the worker's in-flight messages.
+    Messages without a type are routed as default_type, which keeps messages from
+    older producers working.
+    """
+
+    def __init__(self, default_type: str | None = None, concurrency_overrides: dict[str, int] | None = None) -> None:
+        self._routes: dict[str, MessageRoute] = {}
+        self._default_type = default_type
+        self._concurrency_overrides = concurrency_overrides or {}
+
+    def register[T: BaseModel](
+            self,
+            message_type: str,
+            model: type[T],
+            handler: Callable[[T], Awaitable[None]],
+            batch_handler: Callable[[list[T]], Awaitable[None]] | None = None,
+            concurrency: int = 16,
+    ) -> None:
+        concurrency = self._concurrency_overrides.get(message_type, concurrency)
+        self._routes[message_type] = MessageRoute(message_type, model, handler, batch_handler, concurrency)
+        _log.debug("Registered handler for '%s' messages (concurrency=%s).", message_type, concurrency)
+
+    def route(self, message: InboundMessage) -> MessageRoute:
+        """
+        Raises:
+            UnknownMessageTypeError: If no handler is registered for the message type
+        """
+        message_type = message.message_type or self._default_type
+        route = self._routes.get(message_type)
+        if route is None:
+            raise UnknownMessageTypeError(f"No handler registered for message type '{message_type}'.")
+        return route
+
+    async def dispatch(self, message: InboundMessage) -> None:
+        """
+        Validate a message against the model of its type and run the handler.
+
+        Raises:
+            UnknownMessageTypeError: If no handler is registered for the message type
+            MessageValidationError: If the message body does not match the model
+        """
+        route = self.route(message)
+        await self.dispatch_payloads(route, [route.validate(message)])
+
+    @staticmethod
+    async def dispatch_payloads(route: MessageRoute, payloads: list[Any]) -> None:
+        """Run already validated payloads of one type, in a single call when the type has a batch handler."""
+        slot = current_slot.get()
+        if slot is not None:
+            # Waiting for the type's own limit must not hold a slot of the worker-wide one
+            await slot.acquire_other(route.semaphore)
+        else:
+            await route.semaphore.acquire()
+        try:
+            if route.batch_handler and len(payloads) > 1:
+                await route.batch_handler(payloads)
+            else:
+                for payload in payloads:
+                    await route.handler(payload)
+        finally:
+            route.semaphore.release()
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+
+from src.usecases.interfaces.db_interfaces.db_outbox_interface import DBOutboxInterface
+from src.usecases.interfaces.rabbit_interfaces.rabbit_out_in_interface import OutInRabbitMQRepositoryInterface
+from src.usecases.schemas.outbox_schemas import OutboxEventSchema
+
+_log = logging.getLogger(__name__)
+
+
+class OutboxRelayUseCase:
+    def __init__(self, outbox_repo: DBOutboxInterface, rabbit_repo: OutInRabbitMQRepositoryInterface):
+        self.outbox_repo = outbox_repo
+        self.rabbit_repo = rabbit_repo
+
+    async def relay_once(self, batch_size: int) -> int:
+        published = await self.outbox_repo.publish_pending_events(self._publish_events, batch_size)
+        if published:
+            _log.info("OUTBOX: Published %s domain events.", published)
+        return published
+
+    async def run(self, batch_size: int, poll_interval: float) -> None:
+        _log.info("OUTBOX: Relay started (batch_size=%s, poll_interval=%ss).", batch_size, poll_interval)
+        while True:
+            try:
+                published = await self.relay_once(batch_size)
+            except Exception as e:
+                _log.error("OUTBOX: Failed to relay domain events: %s", e)
+                published = 0
+
+            # A full batch means more events are probably waiting, so keep draining
+            if published < batch_size:
+                await asyncio.sleep(poll_interval)
+
+    async def _publish_events(self, events: list[OutboxEventSchema]) -> None:
+        # Events of one user are published in order to the same shard; different users are
+        # pipelined, and any failure rolls back the whole batch
+        by_partition: dict[str | None, list[OutboxEventSchema]] = {}
+        for event in events:
+            by_partition.setdefault(self._partition_key(event), []).append(event)
+        await asyncio.gather(*(
+            self._publish_in_order(partition_key, partition_events)
+            for partition_key, partition_events in by_partition.items()
+        ))
+
+    async def _publish_in_order(self, partition_key: str | None, events: list[OutboxEventSchema]) -> None:
+        for event in events:
+            await self.rabbit_repo.push_task(
+                payload={
+                    "event_id": event.id,
+                    "event_type": event.event_type,
+                    "occurred_at": event.created_at.isoformat(),
+                    "data": event.payload,
+                },
+                message_type=event.event_type,
+                # Stable id, so a batch published again after a failed commit is dropped as a duplicate
+                message_id=f"outbox-{event.id}",
+                spool=False,
+                partition_key=partition_key,
+            )
+
+    @staticmethod
+    def _partition_key(event: OutboxEventSchema) -> str | None:
+        user_id = event.payload.get("user_id")
+        return f"user:{user_id}" if user_id is not None else None
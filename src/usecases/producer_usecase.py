@@ -1,17 +1,157 @@
-import json
+import asyncio
 import logging
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 
+from src.usecases.errors import TaskNotFoundError, UnknownLaneError
 from src.usecases.interfaces.rabbit_interfaces.rabbit_out_in_interface import OutInRabbitMQRepositoryInterface
+from src.usecases.interfaces.rabbit_interfaces.rabbit_rpc_interface import RPCRabbitMQRepositoryInterface
+from src.usecases.interfaces.task_status_interface import TaskStatusInterface
+from src.usecases.schemas.message_schemas import MessageType
+from src.usecases.schemas.task_schemas import TaskStatus, TaskStatusSchema
 
 _log = logging.getLogger(__name__)
 
 
 class ProducerUseCase:
-    def __init__(self, rabbit_repo: OutInRabbitMQRepositoryInterface):
+    def __init__(
+            self,
+            rabbit_repo: OutInRabbitMQRepositoryInterface,
+            rpc_repo: RPCRabbitMQRepositoryInterface,
+            task_status_repo: TaskStatusInterface,
+    ):
         self.rabbit_repo = rabbit_repo
+        self.rpc_repo = rpc_repo
+        self.task_status_repo = task_status_repo
 
-    async def push_test_message(self, data: dict):
-        payload_str = json.dumps(data)
-        _log.info(f"API: Pushing task to RabbitMQ. Payload size: {len(payload_str)} bytes")
-        await self.rabbit_repo.push_task(payload=payload_str)
-        return {"status": "Task successfully pushed", "data": data}
\ No newline at end of file
+    async def push_test_message(self, data: dict, lane: str | None = None):
+        task_id = uuid.uuid4().hex
+        _log.info("API: Pushing task %s to RabbitMQ.", task_id)
+        # Record the task before publishing so the worker can never update a status that does not exist yet
+        await self.task_status_repo.set_status(task_id, TaskStatus.QUEUED)
+        try:
+            await self.rabbit_repo.push_task(
+                payload=data,
+                message_type=MessageType.TEST_TASK.value,
+                message_id=task_id,
+                lane=lane,
+            )
+        except Exception as e:
+            await self._mark_unpublished([task_id], [str(e) or type(e).__name__])
+            raise
+        return {"status": "Task successfully pushed", "task_id": task_id, "data": data}
+
+    async def push_test_messages(self, messages: list[dict], lane: str | None = None) -> list[str | Exception]:
+        """
+        Push several test messages with all of their publishes in flight at once.
+
+        Returns:
+            For each message in order, its task id or the error that kept it from being published
+
+        Raises:
+            UnknownLaneError: If the lane is not configured
+        """
+        task_ids = [uuid.uuid4().hex for _ in messages]
+        _log.info("API: Pushing %s tasks to RabbitMQ.", len(task_ids))
+        await self.task_status_repo.set_statuses(task_ids, TaskStatus.QUEUED)
+        outcomes = await asyncio.gather(
+            *(
+                self.rabbit_repo.push_task(
+                    payload=data,
+                    message_type=MessageType.TEST_TASK.value,
+                    message_id=task_id,
+                    lane=lane,
+                )
+                for task_id, data in zip(task_ids, messages)
+            ),
+            return_exceptions=True,
+        )
+        errors = [
+            (str(outcome) or type(outcome).__name__) if isinstance(outcome, Exception) else None
+            for outcome in outcomes
+        ]
+        await self._mark_unpublished(task_ids, errors)
+        for outcome in outcomes:
+            if isinstance(outcome, UnknownLaneError):
+                raise outcome
+        return [outcome if isinstance(outcome, Exception) else task_id for task_id, outcome in zip(task_ids, outcomes)]
+
+    async def _mark_unpublished(self, task_ids: list[str], errors: list[str | None]) -> None:
+        """Mark tasks whose publish failed as FAILED, so their status does not stay QUEUED until it expires."""
+        failed: dict[str, list[str]] = defaultdict(list)
+        for task_id, error in zip(task_ids, errors):
+            if error is not None:
+                failed[error].append(task_id)
+        try:
+            # Usually a single error, e.g. backpressure, shared by the whole batch
+            for error, ids in failed.items():
+                await self.task_status_repo.set_statuses(ids, TaskStatus.FAILED, error=error, create=False)
+        except Exception as e:
+            _log.warning("Failed to mark %s unpublished tasks as failed: %s", sum(map(len, failed.values())), e)
+
+    async def get_task_status(self, task_id: str, wait: float = 0) -> TaskStatusSchema:
+        """
+        Return the status of a task, waiting up to wait seconds for it to finish.
+
+        Raises:
+            TaskNotFoundError: If the task is unknown or its status has expired
+        """
+        task_status = await self.task_status_repo.get_status(task_id)
+        if task_status is None:
+            raise TaskNotFoundError(f"Task '{task_id}' not found.")
+        if wait <= 0 or task_status.status.is_terminal:
+            return task_status
+
+        try:
+            async with asyncio.timeout(wait):
+                async with aclosing(self.task_status_repo.watch_status(task_id)) as updates:
+                    async for task_status in updates:
+                        if task_status.status.is_terminal:
+                            break
+        except TimeoutError:
+            _log.debug("Task %s is still %s after waiting %ss.", task_id, task_status.status.value, wait)
+        return task_status
+
+    async def stream_task_status(
+            self,
+            task_id: str,
+            max_wait: float,
+            heartbeat: float,
+    ) -> AsyncIterator[TaskStatusSchema | None]:
+        """
+        Yield every status change of a task until it finishes or max_wait seconds pass.
+
+        None is yielded after heartbeat seconds without a change, for the caller to keep
+        the connection alive. The stored status is read again at that point, so a missed
+        update is still delivered and an expired status ends the stream.
+        """
+        deadline = asyncio.get_running_loop().time() + max_wait
+        last: TaskStatusSchema | None = None
+        async with aclosing(self.task_status_repo.watch_status(task_id, heartbeat=heartbeat)) as updates:
+            async for task_status in updates:
+                if task_status is None:
+                    task_status = await self.task_status_repo.get_status(task_id)
+                    if task_status is None:
+                        _log.debug("Status of task %s expired, ending its stream.", task_id)
+                        return
+                    if task_status == last:
+                        task_status = None
+                elif task_status == last:
+                    # The stored status handed out again after a resubscribe
+                    continue
+
+                if task_status is not None:
+                    last = task_status
+                yield task_status
+                if last is not None and last.status.is_terminal:
+                    return
+                if asyncio.get_running_loop().time() >= deadline:
+                    _log.debug("Stream of task %s reached its %ss limit.", task_id, max_wait)
+                    return
+
+    async def call_test_rpc(self, data: dict) -> dict:
+        _log.info("API: Calling worker over RabbitMQ RPC.")
+        result = await self.rpc_repo.call("test.echo", data)
+        return {"status": "RPC call completed", "result": result}
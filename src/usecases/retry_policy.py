@@ -0,0 +1,13 @@
+from collections.abc import Sequence
+
+from src.usecases.errors import NonRetriableMessageError
+
+
+def will_retry(error: Exception, attempt: int, max_attempts: int, retry_delays: Sequence[int]) -> bool:
+    """
+    Whether a message that failed with error on the given attempt goes to a retry tier rather than the dead-letter queue.
+
+    The repository routes failed messages by it and the consumer records task statuses by it,
+    so the recorded status always matches what happens to the message.
+    """
+    return bool(retry_delays) and attempt < max_attempts and not isinstance(error, NonRetriableMessageError)
@@ -15,4 +15,7 @@ class RefreshTokenSchema(BaseModel):
 class TokenData(BaseModel):
     id: Optional[int] = None
     username: Optional[str] = None
-    role: Optional[str] = None
\ No newline at end of file
+    role: Optional[str] = None
+    # Id and expiry (Unix time) of an access token, used to revoke it
+    jti: Optional[str] = None
+    exp: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,36 @@
+from datetime import datetime
+from enum import Enum as PyEnum
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+
+class MessageType(str, PyEnum):
+    TEST_TASK = 'test.task'
+
+
+class ClaimResult(str, PyEnum):
+    CLAIMED = 'claimed'
+    DUPLICATE = 'duplicate'
+    IN_PROGRESS = 'in_progress'
+
+
+class InboundMessage(BaseModel):
+    body: Any
+    message_id: Optional[str] = None
+    message_type: Optional[str] = None
+    attempt: int = 1
+    redelivered: bool = False
+    published_at: Optional[float] = None
+
+
+class TestTaskPayload(BaseModel):
+    content: str
+    sender: str = "Template API"
+
+
+class DomainEventPayload(BaseModel):
+    event_id: int
+    event_type: str
+    occurred_at: datetime
+    data: dict
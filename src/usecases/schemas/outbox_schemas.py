@@ -0,0 +1,18 @@
+from datetime import datetime
+from enum import Enum as PyEnum
+
+from pydantic import BaseModel, ConfigDict
+
+
+class DomainEventType(str, PyEnum):
+    USER_CREATED = 'user.created'
+    USER_PASSWORD_CHANGED = 'user.password_changed'
+
+
+class OutboxEventSchema(BaseModel):
+    id: int
+    event_type: str
+    payload: dict
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class TokenBucket(BaseModel):
+    key: str
+    capacity: int
+    refill_per_second: float
@@ -0,0 +1,23 @@
+from datetime import datetime
+from enum import Enum as PyEnum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class TaskStatus(str, PyEnum):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    @property
+    def is_terminal(self) -> bool:
+        return self in (TaskStatus.DONE, TaskStatus.FAILED)
+
+
+class TaskStatusSchema(BaseModel):
+    task_id: str
+    status: TaskStatus
+    updated_at: datetime
+    error: Optional[str] = None
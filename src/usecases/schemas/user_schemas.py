@@ -2,6 +2,8 @@ from enum import Enum as PyEnum
 
 from pydantic import BaseModel, ConfigDict
 
+from src.usecases.schemas.auth_schemas import RefreshTokenSchema
+
 
 class UserRole(str, PyEnum):
     USER = 'user'
@@ -20,4 +22,8 @@ class UserSchema(BaseModel):
     hashed_password: str
     role: UserRole
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserWithTokenSchema(UserSchema):
+    refresh_token: RefreshTokenSchema | None = None
\ No newline at end of file
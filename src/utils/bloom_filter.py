@@ -0,0 +1,47 @@
+import hashlib
+import math
+from collections.abc import Iterable
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership test without false negatives.
+
+    "Not in the filter" is certain; "in the filter" is wrong with about
+    error_rate probability while at most capacity items are added. Positions come
+    from one 128-bit blake2b digest split into two 64-bit hashes (double hashing),
+    so a lookup costs a single hash computation.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._count = 0
+
+    @classmethod
+    def from_items(cls, items: Iterable[str], capacity: int, error_rate: float = 0.001) -> "BloomFilter":
+        bloom_filter = cls(capacity, error_rate)
+        for item in items:
+            bloom_filter.add(item)
+        return bloom_filter
+
+    def __len__(self) -> int:
+        """Number of add() calls, including repeated items."""
+        return self._count
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
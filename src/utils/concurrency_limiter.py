@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+
+from src.utils.metrics import registry
+
+_log = logging.getLogger(__name__)
+
+_limit_gauge = registry.gauge("worker_concurrency_limit", "Current in-flight message limit of the worker.")
+_in_flight_gauge = registry.gauge("worker_in_flight_messages", "Messages currently being handled by the worker.")
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    In-flight limit that adapts to handler latency and errors (AIMD).
+
+    Every successful completion raises the limit by 1/limit, i.e. by about one
+    per limit completions. A failure, or a short-term average latency that is
+    latency_tolerance times above the baseline (a minimum of observed latencies
+    that slowly drifts up, so it follows a permanently slower handler), multiplies
+    the limit by backoff. Decreases happen at most once per short-term latency, so a burst of
+    slow completions from the same overload only backs off once. The limit
+    always stays within [floor, ceiling].
+
+    With floor == ceiling it is a plain fixed-size semaphore.
+    """
+
+    def __init__(
+            self,
+            initial: int,
+            floor: int,
+            ceiling: int,
+            latency_tolerance: float = 2.0,
+            backoff: float = 0.7,
+    ) -> None:
+        self.floor = max(1, floor)
+        self.ceiling = max(self.floor, ceiling)
+        self._limit = float(min(max(initial, self.floor), self.ceiling))
+        self._latency_tolerance = latency_tolerance
+        self._backoff = backoff
+
+        self._in_flight = 0
+        self._short_latency: float | None = None
+        self._baseline_latency: float | None = None
+        self._last_decrease = 0.0
+        self._changed = asyncio.Condition()
+        _limit_gauge.set(self.limit)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+            _in_flight_gauge.set(self._in_flight)
+
+    async def release(self, latency: float | None = None, overloaded: bool = False) -> None:
+        """
+        Args:
+            latency: Handling time of the finished message in seconds, None when the slot went unused
+            overloaded: Whether the handler failed in a way that may be caused by load
+        """
+        async with self._changed:
+            self._in_flight -= 1
+            _in_flight_gauge.set(self._in_flight)
+            if latency is not None:
+                self._update(latency, overloaded)
+            # Wake only as many waiters as there are free slots
+            self._changed.notify(max(0, self.limit - self._in_flight))
+
+    def _update(self, latency: float, overloaded: bool) -> None:
+        if self._short_latency is None:
+            self._short_latency = self._baseline_latency = latency
+        else:
+            self._short_latency += 0.2 * (latency - self._short_latency)
+            if latency < self._baseline_latency:
+                self._baseline_latency = latency
+            else:
+                self._baseline_latency += 0.001 * (latency - self._baseline_latency)
+
+        congested = self._short_latency > self._baseline_latency * self._latency_tolerance
+        previous = self.limit
+        now = time.monotonic()
+
+        if overloaded or congested:
+            if now - self._last_decrease >= self._short_latency:
+                self._limit = max(self.floor, self._limit * self._backoff)
+                self._last_decrease = now
+        else:
+            self._limit = min(self.ceiling, self._limit + 1 / self._limit)
+
+        if self.limit != previous:
+            _limit_gauge.set(self.limit)
+            _log.debug(
+                "Concurrency limit %s -> %s (latency %.3fs, baseline %.3fs, overloaded=%s)",
+                previous, self.limit, self._short_latency, self._baseline_latency, overloaded,
+            )
+
+
+class LimiterSlot:
+    """
+    The limiter slot held by one message, exposed to its handler through current_slot.
+
+    A handler that first has to wait for a narrower limit, such as the one of its
+    message type, gives the slot back for that wait: a backlog of one type then
+    neither holds slots the other types could use nor counts as handling time.
+    """
+
+    def __init__(self, limiter: AdaptiveConcurrencyLimiter) -> None:
+        self._limiter = limiter
+        self.held = True
+        # Start of the handling time reported on release
+        self.started = time.perf_counter()
+
+    async def acquire_other(self, semaphore: asyncio.Semaphore) -> None:
+        """Acquire semaphore, releasing this slot while waiting for it."""
+        if not semaphore.locked():
+            await semaphore.acquire()
+            return
+
+        await self._limiter.release()
+        self.held = False
+        try:
+            await semaphore.acquire()
+        except BaseException:
+            await self._reacquire()
+            raise
+        try:
+            await self._reacquire()
+        except BaseException:
+            semaphore.release()
+            raise
+
+    async def _reacquire(self) -> None:
+        await self._limiter.acquire()
+        self.held = True
+        self.started = time.perf_counter()
+
+
+# Slot of the message handled by the current task, None outside of a limited consumer
+current_slot: ContextVar[LimiterSlot | None] = ContextVar("current_slot", default=None)
@@ -0,0 +1,117 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from src.config import LoggingConfig
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+_listener: QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record with the fields log collectors index on."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets each logger emit at most rate records below ERROR per window.
+
+    The rest are dropped and counted; the first record of the next window from
+    that logger carries the number suppressed in between, so a log storm costs
+    a bounded amount of I/O but does not go unnoticed. Errors always pass.
+    """
+
+    def __init__(self, rate: int, window: float) -> None:
+        super().__init__()
+        self._rate = rate
+        self._window = window
+        # logger name -> [window start, records passed, records suppressed]
+        self._state: dict[str, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self._rate <= 0 or record.levelno >= logging.ERROR:
+            return True
+
+        now = time.monotonic()
+        state = self._state.get(record.name)
+        if state is None:
+            state = self._state[record.name] = [now, 0, 0]
+        elif now - state[0] >= self._window:
+            suppressed = state[2]
+            state[:] = [now, 0, 0]
+            if suppressed:
+                record.msg = f"{record.msg} [{suppressed} similar record(s) suppressed]"
+
+        if state[1] >= self._rate:
+            state[2] += 1
+            return False
+        state[1] += 1
+        return True
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread as they are.
+
+    The stock QueueHandler formats the message in the calling thread, i.e. on the
+    event loop; here only exception info is rendered up front (the traceback
+    objects are not safe to keep around), everything else happens in the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(config: LoggingConfig | None = None) -> None:
+    """
+    Route all logging through a queue to a background thread that formats and writes it.
+
+    Safe to call more than once: later calls are no-ops, so every entry point can call it.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    config = config or LoggingConfig()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if config.JSON else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(config.RATE_LIMIT, config.RATE_LIMIT_WINDOW_SECONDS))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(config.LOG_LEVEL)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(_listener.stop)
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+import time
+
+from src.utils.metrics import registry
+
+_log = logging.getLogger(__name__)
+
+_lag_gauge = registry.gauge("event_loop_lag_seconds", "Smoothed delay of the event loop in running a due callback.")
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop runs a sleeping task, i.e. how long callbacks
+    wait behind blocking or CPU-heavy work.
+
+    The smoothed value rises at once and decays over a few intervals, so one short
+    stall raises it for a moment but does not keep it up.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def lag(self) -> float:
+        """Smoothed lag in seconds."""
+        return self._lag
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.monotonic() + self._interval
+            await asyncio.sleep(self._interval)
+            measured = max(0.0, time.monotonic() - expected)
+            if measured >= self._lag:
+                self._lag = measured
+            else:
+                self._lag += 0.3 * (measured - self._lag)
+            _lag_gauge.set(self._lag)
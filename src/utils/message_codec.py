@@ -0,0 +1,120 @@
+import gzip
+import json
+import logging
+from typing import Any
+
+from src.usecases.errors import MessageDecodeError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_log = logging.getLogger(__name__)
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+GZIP_ENCODING = "gzip"
+ZSTD_ENCODING = "zstd"
+
+# Values older producers may put into content_encoding that do not mean compression
+_IDENTITY_ENCODINGS = {None, "", "identity", "utf-8", "utf8"}
+
+_zstd_compressor = zstandard.ZstdCompressor(level=3) if zstandard else None
+_zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+
+def resolve_content_type(requested: str) -> str:
+    """Return the requested content type, or JSON when its codec is not installed."""
+    if requested == MSGPACK_CONTENT_TYPE and msgpack is None:
+        _log.warning("msgpack is not installed, falling back to JSON message encoding.")
+        return JSON_CONTENT_TYPE
+    if requested not in (JSON_CONTENT_TYPE, MSGPACK_CONTENT_TYPE):
+        _log.warning("Unsupported message content type '%s', falling back to JSON.", requested)
+        return JSON_CONTENT_TYPE
+    return requested
+
+
+def resolve_compression(requested: str | None) -> str | None:
+    """Return the requested compression, gzip when zstd is not installed, or None to disable it."""
+    if not requested or requested == "none":
+        return None
+    if requested == ZSTD_ENCODING and zstandard is None:
+        _log.warning("zstandard is not installed, falling back to gzip message compression.")
+        return GZIP_ENCODING
+    if requested not in (GZIP_ENCODING, ZSTD_ENCODING):
+        _log.warning("Unsupported message compression '%s', compression disabled.", requested)
+        return None
+    return requested
+
+
+def encode_message(
+        data: Any,
+        content_type: str = JSON_CONTENT_TYPE,
+        compression: str | None = None,
+        compression_threshold: int = 4096,
+) -> tuple[bytes, str, str | None]:
+    """
+    Serialize data and compress it when the serialized body reaches compression_threshold bytes.
+
+    Returns:
+        tuple: Message body, content type and content encoding (None when not compressed)
+    """
+    if content_type == MSGPACK_CONTENT_TYPE:
+        body = msgpack.packb(data)
+    elif orjson is not None:
+        body = orjson.dumps(data)
+    else:
+        body = json.dumps(data).encode("utf-8")
+
+    if compression is None or len(body) < compression_threshold:
+        return body, content_type, None
+
+    if compression == ZSTD_ENCODING:
+        return _zstd_compressor.compress(body), content_type, ZSTD_ENCODING
+    return gzip.compress(body, compresslevel=5), content_type, GZIP_ENCODING
+
+
+def decode_message(body: bytes, content_type: str | None = None, content_encoding: str | None = None) -> Any:
+    """
+    Decode a message body according to its content type and content encoding.
+
+    Messages without these properties are treated as plain JSON, which keeps
+    messages from older producers readable.
+
+    Raises:
+        MessageDecodeError: If the body is malformed or its format is not supported
+    """
+    try:
+        if content_encoding == GZIP_ENCODING:
+            body = gzip.decompress(body)
+        elif content_encoding == ZSTD_ENCODING:
+            if _zstd_decompressor is None:
+                raise MessageDecodeError("Message is zstd-compressed but zstandard is not installed.")
+            body = _zstd_decompressor.decompress(body)
+        elif content_encoding not in _IDENTITY_ENCODINGS:
+            raise MessageDecodeError(f"Unsupported message content encoding '{content_encoding}'.")
+
+        if content_type == MSGPACK_CONTENT_TYPE:
+            if msgpack is None:
+                raise MessageDecodeError("Message is msgpack-encoded but msgpack is not installed.")
+            return msgpack.unpackb(body)
+        if orjson is not None:
+            return orjson.loads(body)
+        return json.loads(body)
+
+    except MessageDecodeError:
+        raise
+    except Exception as e:
+        raise MessageDecodeError(f"Failed to decode message ({content_type}, {content_encoding}): {e}") from e
@@ -1,4 +1,5 @@
 import logging
+import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -21,31 +22,28 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict) -> str:
-    _log.info(f"Starting to create access token. Source data: {data}")
+    _log.debug("Creating access token for user ID %s.", data.get("user_id"))
     to_encode = data.copy()
     to_encode.update({"id": data.get('user_id')})
     expire = datetime.now(timezone.utc) + SecurityConfig().access_token_expires
-    to_encode.update({"exp": expire})
+    # A unique id per token, so a single token can be revoked before it expires
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SecurityConfig().SECRET_KEY, algorithm=SecurityConfig().ALGORITHM)
-    _log.info("Access token successfully created.")
     return encoded_jwt
 
 def create_refresh_token(data: dict) -> str:
-    _log.info(f"Starting to create refresh token. Source data: {data}")
+    _log.debug("Creating refresh token for user ID %s.", data.get("user_id"))
     to_encode = data.copy()
     to_encode.update({"id": data.get('user_id')})
     expire = datetime.now(timezone.utc) + SecurityConfig().refresh_token_expires
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SecurityConfig().SECRET_KEY, algorithm=SecurityConfig().ALGORITHM)
-    _log.info("Refresh token successfully created.")
     return encoded_jwt
 
 
 def verify_token_and_get_data(token: str) -> TokenData:
     try:
-        _log.info("Starting token verification.")
         payload = jwt.decode(token, SecurityConfig().SECRET_KEY, algorithms=[SecurityConfig().ALGORITHM])
-        _log.info(f"Token successfully decoded. Payload: {payload}")
         username: str = payload.get("sub")
         role: Optional[str] = payload.get("role")
         user_id: Optional[int] = payload.get("id")
@@ -58,7 +56,7 @@ def verify_token_and_get_data(token: str) -> TokenData:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        return TokenData(id=user_id, username=username, role=role)
+        return TokenData(id=user_id, username=username, role=role, jti=payload.get("jti"), exp=payload.get("exp"))
     except ExpiredSignatureError:
         _log.error("Token has expired.")
         raise HTTPException(
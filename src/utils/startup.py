@@ -0,0 +1,38 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+
+_log = logging.getLogger(__name__)
+
+
+async def run_startup_phases(phases: dict[str, Awaitable]) -> dict[str, float]:
+    """
+    Run independent startup phases concurrently and log how long each one took.
+
+    When a phase fails the others are cancelled, so nothing keeps connecting in the
+    background while the caller is already cleaning up, and the phase's error is raised.
+
+    Returns:
+        dict: Duration of every phase in seconds
+    """
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+
+    async def timed(name: str, phase: Awaitable) -> None:
+        phase_started = time.perf_counter()
+        try:
+            await phase
+        finally:
+            timings[name] = time.perf_counter() - phase_started
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            for name, phase in phases.items():
+                group.create_task(timed(name, phase))
+    except BaseExceptionGroup as e:
+        raise e.exceptions[0]
+    finally:
+        report = ", ".join(f"{name} {duration:.3f}s" for name, duration in timings.items())
+        _log.info("Startup phases: %s; total %.3fs", report, time.perf_counter() - started)
+    return timings
@@ -1,4 +1,4 @@
 #!/bin/sh
 
 cd src
-uv run uvicorn main:app --host 0.0.0.0 --port 8000 --reload
+exec uv run uvicorn main:app --host 0.0.0.0 --port 8000 --reload
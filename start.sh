@@ -1,4 +1,4 @@
 #!/bin/sh
 
-cd src
-uv run uvicorn main:app --host 0.0.0.0 --port 8000 --reload
+# Production: multi-process server configured through SERVER_* settings, see src/server.py
+exec uv run python -m src.server